@@ -0,0 +1,27 @@
+"""
+python -m benchmarks [-k filter] [-o results.json] [-c previous.json]
+
+Runs offline against an in-memory sqlite database using tests.settings.
+"""
+import os
+
+import django
+
+
+def main():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+    django.setup()
+
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+
+    from benchmarks import bench_core, bench_render  # noqa: F401  registers benchmarks
+    from benchmarks.database import setup_database
+    from benchmarks.runner import main as run_main
+
+    setup_database()
+    run_main()
+
+
+if __name__ == '__main__':
+    main()
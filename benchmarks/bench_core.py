@@ -0,0 +1,180 @@
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from benchmarks.runner import bench
+from djackal import query_filter
+from djackal.pagination import CursorPagination, LimitOffsetPagination, NoCountPagination, \
+    PageNumberPagination
+from djackal.serializers import BaseModelSerializer
+from djackal.storage.models import Storage
+from djackal.views.base import DjackalAPIView
+from tests.models import TestModel
+from tests.test_extra_mixin import TestModel1
+from tests.test_fields import FieldTestModel
+
+factory = APIRequestFactory()
+
+LARGE_SCHEMA = {
+    **{'char{}'.format(i): 'field_char' for i in range(20)},
+    **{'int{}'.format(i): {'field': 'field_int', 'format': int} for i in range(20)},
+    **{'multi{}'.format(i): ('field_char__contains', 'field_text__contains') for i in range(10)},
+    'range': {'field': 'field_a', 'action': 'range'},
+    'ids': {'field': 'id', 'action': 'in'},
+}
+LARGE_PARAMS = {
+    'char0': 'a',
+    'int3': '5',
+    'multi1': 'text',
+    'range': ['1', '50'],
+    'ids': [str(i) for i in range(1, 200)],
+}
+
+
+class BenchSerializer(BaseModelSerializer):
+    class Meta:
+        model = TestModel
+        fields = '__all__'
+
+
+class BenchListView(DjackalAPIView):
+    model = TestModel
+    authentication_classes = ()
+    filter_schema = LARGE_SCHEMA
+    ordering_map = {'int': '-field_int', 'char': 'field_char,id'}
+
+    def get(self, request):
+        return self.simple_response({'ok': True})
+
+
+class BareAPIView(APIView):
+    authentication_classes = ()
+
+    def get(self, request):
+        return Response({'result': {'ok': True}, 'meta': {}})
+
+
+@bench('query_filter.filtering_large_schema', number=200)
+def bench_filtering():
+    query_filter.filtering(TestModel.objects.all(), LARGE_PARAMS, LARGE_SCHEMA).query.sql_with_params()
+
+
+@bench('query_filter.filtering_large_schema_execute', number=20)
+def bench_filtering_execute():
+    list(query_filter.filtering(TestModel.objects.all(), LARGE_PARAMS, LARGE_SCHEMA))
+
+
+def setup_filtered_view():
+    view = BenchListView()
+    view.request = view.initialize_request(factory.get('/', {**LARGE_PARAMS, 'ordering': 'int'}))
+    view.args, view.kwargs = (), {}
+    return view
+
+
+@bench('view.get_filtered_queryset', setup=setup_filtered_view, number=200)
+def bench_get_filtered_queryset(view):
+    view.get_filtered_queryset().query.sql_with_params()
+
+
+def setup_rows(count):
+    return lambda: list(TestModel.objects.order_by('id')[:count])
+
+
+@bench('serializer.many_1k', setup=setup_rows(1000), number=3)
+def bench_serializer_1k(rows):
+    BenchSerializer(rows, many=True).data
+
+
+@bench('serializer.many_10k', setup=setup_rows(10000), number=1, repeat=3)
+def bench_serializer_10k(rows):
+    BenchSerializer(rows, many=True).data
+
+
+def setup_pagination(pagination_class, params):
+    def setup():
+        view = BenchListView()
+        request = view.initialize_request(factory.get('/', params))
+        paginator = pagination_class()
+        if pagination_class is CursorPagination:
+            paginator.ordering = 'id'
+            paginator.page_size = 10
+        return paginator, request, view
+
+    return setup
+
+
+def paginate(paginator, request, view):
+    list(paginator.paginate_queryset(TestModel.objects.order_by('id'), request, view=view))
+
+
+for _name, _class, _shallow, _deep in (
+        ('page_number', PageNumberPagination, {'page': 1}, {'page': 900}),
+        ('limit_offset', LimitOffsetPagination, {'limit': 10, 'offset': 0}, {'limit': 10, 'offset': 9000}),
+        ('no_count', NoCountPagination, {'page': 1}, {'page': 900}),
+        ('cursor', CursorPagination, {}, None),
+):
+    bench('pagination.{}_shallow'.format(_name), setup=setup_pagination(_class, _shallow), number=20)(paginate)
+    if _deep is not None:
+        bench('pagination.{}_deep'.format(_name), setup=setup_pagination(_class, _deep), number=20)(paginate)
+
+
+def setup_cursor_deep():
+    paginator, request, view = setup_pagination(CursorPagination, {})()
+    queryset = TestModel.objects.order_by('id')
+    for _ in range(3):
+        paginator.paginate_queryset(queryset, request, view=view)
+        request = view.initialize_request(factory.get(paginator.get_next_link()))
+    return paginator, request, view
+
+
+bench('pagination.cursor_deep', setup=setup_cursor_deep, number=20)(paginate)
+
+
+def setup_extra_instance():
+    obj = TestModel1(extra={'b_field1': 'value'}, field_char='char')
+    return obj
+
+
+@bench('extra_mixin.get_extra_attribute', setup=setup_extra_instance, number=10000)
+def bench_extra_get(obj):
+    obj.b_field1
+
+
+@bench('extra_mixin.set_extra_attribute', setup=setup_extra_instance, number=10000)
+def bench_extra_set(obj):
+    obj.b_field2 = 'value'
+
+
+@bench('extra_mixin.get_model_attribute', setup=setup_extra_instance, number=10000)
+def bench_extra_model_attribute(obj):
+    obj.field_char
+    obj._state
+    obj.pk
+
+
+@bench('json_field.round_trip', number=100)
+def bench_json_field():
+    obj = FieldTestModel.objects.create(json={'key': 'value', 'list': list(range(20))})
+    FieldTestModel.objects.get(pk=obj.pk).json
+
+
+@bench('storage.set', number=200)
+def bench_storage_set():
+    Storage.set('bench_key', 'value')
+
+
+@bench('storage.get', setup=lambda: Storage.set('bench_key', 'value'), number=200)
+def bench_storage_get(_):
+    Storage.get('bench_key')
+
+
+def setup_dispatch(view_class):
+    return lambda: (view_class.as_view(), factory.get('/'))
+
+
+def dispatch(view, request):
+    view(request).render()
+
+
+bench('dispatch.djackal_view', setup=setup_dispatch(BenchListView), number=500)(dispatch)
+bench('dispatch.bare_apiview', setup=setup_dispatch(BareAPIView), number=500)(dispatch)
@@ -0,0 +1,71 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from benchmarks.bench_core import BenchSerializer
+from benchmarks.runner import bench
+from djackal.renderers import get_json_dumps
+from djackal.views.base import DjackalAPIView
+from tests.models import TestModel
+
+factory = APIRequestFactory()
+
+
+class DefaultRenderView(DjackalAPIView):
+    authentication_classes = ()
+    renderer_classes = (JSONRenderer,)
+    rows = None
+
+    def get(self, request):
+        return self.simple_response(self.rows, meta={'count': len(self.rows)})
+
+
+class FastRenderView(DefaultRenderView):
+    fast_render = True
+
+
+def setup_payload():
+    data = BenchSerializer(TestModel.objects.order_by('id')[:1000], many=True).data
+    return {'result': data, 'meta': {'count': len(data)}}
+
+
+def payload_size(payload):
+    return len(JSONRenderer().render(payload))
+
+
+@bench('render.drf_json_renderer', setup=setup_payload, number=20, size=payload_size)
+def bench_drf_renderer(payload):
+    JSONRenderer().render(payload)
+
+
+@bench('render.fast_json_dumps', setup=setup_payload, number=20, size=payload_size)
+def bench_fast_dumps(payload):
+    get_json_dumps()(payload)
+
+
+def setup_view(view_class):
+    def setup():
+        view_class.rows = setup_payload()['result']
+        return view_class.as_view(), factory.get('/')
+
+    return setup
+
+
+def render(response):
+    # FastJSONResponse is encoded on construction, DRF Response on render()
+    if hasattr(response, 'render'):
+        response.render()
+    return response.content
+
+
+def response_size(view, request):
+    return len(render(view(request)))
+
+
+def dispatch(view, request):
+    render(view(request))
+
+
+bench('render.dispatch_drf_response', setup=setup_view(DefaultRenderView), number=20,
+      size=response_size)(dispatch)
+bench('render.dispatch_fast_response', setup=setup_view(FastRenderView), number=20,
+      size=response_size)(dispatch)
@@ -0,0 +1,32 @@
+from django.core.management import call_command
+from django.db import connection
+
+from tests.models import TestModel
+
+ROW_COUNT = 10000
+
+
+def setup_database():
+    """
+    create tables for every installed and imported model, then seed rows.
+    """
+    # models declared in test modules must be imported before syncdb
+    import tests.test_extra_mixin  # noqa: F401
+    import tests.test_fields  # noqa: F401
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    if TestModel.objects.exists():
+        return
+
+    TestModel.objects.bulk_create([
+        TestModel(
+            field_char=chr(ord('a') + i % 26),
+            field_int=i,
+            field_text='text {}'.format(i) * 10,
+            field_a=i % 100,
+            field_b=i % 7,
+            field_bool=i % 2 == 0,
+        )
+        for i in range(ROW_COUNT)
+    ], batch_size=1000)
+    connection.close_if_unusable_or_obsolete()
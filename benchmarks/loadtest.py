@@ -0,0 +1,207 @@
+"""
+End-to-end load test of djackal generic views on localhost.
+
+    python -m benchmarks.loadtest [-c 8] [-n 500] [--server wsgiref|gunicorn] [-o result.json]
+
+Boots the `benchmarks.urls` project in a separate process on a seeded sqlite
+file database, drives every endpoint at the given concurrency and reports
+throughput and p50/p95/p99 latency per endpoint.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+SEED_ROWS = 2000
+
+ENDPOINTS = (
+    ('list', 'GET', '/items/', None),
+    ('list_paged', 'GET', '/items/paged/?page=3', None),
+    ('list_paged_deep', 'GET', '/items/paged/?page=150', None),
+    ('list_filtered', 'GET', '/items/filtered/?char=c&a=10&a=60&bool=true&ordering=int', None),
+    ('detail', 'GET', '/items/{pk}/', None),
+    ('create', 'POST', '/items/create/', {'field_char': 'z', 'field_int': 1}),
+)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed():
+    from django.core.management import call_command
+    from tests.models import TestModel
+
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    if TestModel.objects.exists():
+        return
+    TestModel.objects.bulk_create([
+        TestModel(field_char=chr(ord('a') + i % 26), field_int=i, field_text='text' * 20,
+                  field_a=i % 100, field_b=i % 7, field_bool=i % 2 == 0)
+        for i in range(SEED_ROWS)
+    ], batch_size=500)
+
+
+def serve(port):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+    seed()
+
+    from benchmarks.wsgi import application
+    httpd = make_server('127.0.0.1', port, application, server_class=ThreadingWSGIServer,
+                        handler_class=QuietHandler)
+    httpd.serve_forever()
+
+
+def start_server(server, port, workers):
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'benchmarks.settings'}
+    if server == 'gunicorn':
+        subprocess.run([sys.executable, '-m', 'benchmarks.loadtest', '--seed-only'], env=env, check=True)
+        command = [sys.executable, '-m', 'gunicorn', 'benchmarks.wsgi:application', '-b', f'127.0.0.1:{port}',
+                   '-w', str(workers), '--threads', '4', '--log-level', 'warning']
+    else:
+        command = [sys.executable, '-m', 'benchmarks.loadtest', '--serve', str(port)]
+    return subprocess.Popen(command, env=env)
+
+
+def wait_for_server(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server did not start on port {port}')
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    # nearest-rank percentile
+    index = max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Worker:
+    def __init__(self, port):
+        self.port = port
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        return conn
+
+    def request(self, method, path, body):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        payload = json.dumps(body) if body is not None else None
+        start = time.perf_counter()
+        try:
+            conn = self.connection()
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self.local.conn = None
+            status = None
+        return time.perf_counter() - start, status
+
+
+def drive(port, method, path, body, requests, concurrency):
+    worker = Worker(port)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: worker.request(method, path, body), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status in results if status is None or status >= 400)
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'throughput': requests / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+def run(args):
+    port = args.port or free_port()
+    process = start_server(args.server, port, args.workers)
+    try:
+        wait_for_server(port)
+        results = {}
+        print('{:<18} {:>10} {:>8} {:>10} {:>10} {:>10}'.format(
+            'endpoint', 'req/s', 'errors', 'p50 ms', 'p95 ms', 'p99 ms'))
+        for name, method, path, body in ENDPOINTS:
+            if args.endpoint and name not in args.endpoint:
+                continue
+            path = path.format(pk=SEED_ROWS // 2)
+            # warm up connections and caches
+            drive(port, method, path, body, min(args.requests, args.concurrency * 2), args.concurrency)
+            result = drive(port, method, path, body, args.requests, args.concurrency)
+            results[name] = result
+            print('{:<18} {:>10.1f} {:>8} {:>10.2f} {:>10.2f} {:>10.2f}'.format(
+                name, result['throughput'], result['errors'], result['p50_ms'], result['p95_ms'], result['p99_ms']))
+    finally:
+        process.terminate()
+        process.wait()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'server': args.server, 'results': results}, f, indent=2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test djackal generic views on localhost.')
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('-n', '--requests', type=int, default=500, help='requests per endpoint')
+    parser.add_argument('-e', '--endpoint', action='append', help='endpoint name to run, repeatable')
+    parser.add_argument('--server', choices=('wsgiref', 'gunicorn'), default='wsgiref')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('-o', '--output', default=None, help='write results as JSON to this path')
+    parser.add_argument('--serve', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--seed-only', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve is not None:
+        return serve(args.serve)
+    if args.seed_only:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+        import django
+        django.setup()
+        return seed()
+    return run(args)
+
+
+if __name__ == '__main__':
+    main()
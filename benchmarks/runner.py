@@ -0,0 +1,143 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+_benchmarks = []
+
+
+class Benchmark:
+    def __init__(self, name, func, setup=None, number=1, repeat=5, warmup=1, group=None, size=None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.number = number
+        self.repeat = repeat
+        self.warmup = warmup
+        self.group = group or name.split('.')[0]
+        # size(*setup_args) -> bytes produced per call, reported as bytes_per_second
+        self.size = size
+
+    def run(self):
+        args = self.setup() if self.setup else ()
+        if not isinstance(args, tuple):
+            args = (args,)
+
+        for _ in range(self.warmup):
+            self.func(*args)
+
+        timings = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for _ in range(self.number):
+                self.func(*args)
+            timings.append((time.perf_counter() - start) / self.number)
+
+        median = statistics.median(timings)
+        result = {
+            'group': self.group,
+            'number': self.number,
+            'repeat': self.repeat,
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'mean': statistics.mean(timings),
+            'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            'ops': 1 / median if median else None,
+        }
+        if self.size is not None:
+            result['bytes_per_second'] = self.size(*args) / median if median else None
+        return result
+
+
+def bench(name, setup=None, number=1, repeat=5, warmup=1, group=None, size=None):
+    """
+    register a benchmark. setup() runs once, its return value is passed to the benchmark.
+    """
+
+    def decorator(func):
+        _benchmarks.append(Benchmark(name, func, setup=setup, number=number, repeat=repeat,
+                                     warmup=warmup, group=group, size=size))
+        return func
+
+    return decorator
+
+
+def get_benchmarks(pattern=None):
+    if not pattern:
+        return list(_benchmarks)
+    return [b for b in _benchmarks if pattern in b.name]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def collect_meta():
+    import django
+    import rest_framework
+
+    return {
+        'revision': git_revision(),
+        'created': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'rest_framework': rest_framework.VERSION,
+        'platform': platform.platform(),
+    }
+
+
+def run(pattern=None, out=sys.stdout):
+    results = {}
+    for benchmark in get_benchmarks(pattern):
+        result = benchmark.run()
+        results[benchmark.name] = result
+        line = '{:<50} {:>12.3f} us  (min {:.3f} us)'.format(
+            benchmark.name, result['median'] * 1e6, result['min'] * 1e6
+        )
+        if result.get('bytes_per_second'):
+            line += '  {:.1f} MB/s'.format(result['bytes_per_second'] / 1e6)
+        out.write(line + '\n')
+    return {'meta': collect_meta(), 'results': results}
+
+
+def compare(base, current, out=sys.stdout):
+    """
+    print median ratio current / base for benchmarks present in both runs.
+    """
+    out.write('{:<50} {:>12} {:>12} {:>8}\n'.format('benchmark', 'base us', 'current us', 'ratio'))
+    for name, result in current['results'].items():
+        base_result = base['results'].get(name)
+        if base_result is None:
+            continue
+        ratio = result['median'] / base_result['median'] if base_result['median'] else float('nan')
+        out.write('{:<50} {:>12.3f} {:>12.3f} {:>7.2f}x\n'.format(
+            name, base_result['median'] * 1e6, result['median'] * 1e6, ratio
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run djackal micro benchmarks.')
+    parser.add_argument('-k', '--filter', default=None, help='only run benchmarks whose name contains this')
+    parser.add_argument('-o', '--output', default=None, help='write results as JSON to this path')
+    parser.add_argument('-c', '--compare', default=None, help='JSON results of a previous run to compare with')
+    args = parser.parse_args(argv)
+
+    result = run(args.filter)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), result)
+    return result
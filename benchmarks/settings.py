@@ -0,0 +1,20 @@
+import os
+import tempfile
+
+from tests.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['*']
+
+ROOT_URLCONF = 'benchmarks.urls'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'DJACKAL_LOADTEST_DB', os.path.join(tempfile.gettempdir(), 'djackal_loadtest.sqlite3')
+        ),
+        'OPTIONS': {'timeout': 30},
+    },
+}
@@ -0,0 +1,50 @@
+from django.urls import path
+
+from djackal.views.generics import CreateAPIView, DetailAPIView, ListAPIView
+from tests.models import TestModel, TestSerializer
+
+
+class LoadTestMixin:
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = ()
+
+
+class ItemListAPI(LoadTestMixin, ListAPIView):
+    extra_map = {'field_a__lt': 5}
+
+
+class ItemPagedListAPI(LoadTestMixin, ListAPIView):
+    paging = True
+    ordering_default = 'id'
+
+
+class ItemFilteredListAPI(LoadTestMixin, ListAPIView):
+    paging = True
+    ordering_default = 'id'
+    filter_schema = {
+        'char': 'field_char',
+        'a': {'field': 'field_a', 'action': 'range'},
+        'bool': {'field': 'field_bool', 'format': lambda v: v == 'true'},
+    }
+    ordering_map = {'int': '-field_int'}
+
+
+class ItemDetailAPI(LoadTestMixin, DetailAPIView):
+    lookup_map = {'pk': 'pk'}
+
+
+class ItemCreateAPI(LoadTestMixin, CreateAPIView):
+    data_schema = {
+        'field_char': {'type': 'str'},
+        'field_int': {'convert': int},
+    }
+
+
+urlpatterns = [
+    path('items/', ItemListAPI.as_view()),
+    path('items/paged/', ItemPagedListAPI.as_view()),
+    path('items/filtered/', ItemFilteredListAPI.as_view()),
+    path('items/<int:pk>/', ItemDetailAPI.as_view()),
+    path('items/create/', ItemCreateAPI.as_view()),
+]
@@ -0,0 +1,137 @@
+import hashlib
+import threading
+import time
+
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from djackal.settings import djackal_settings
+
+COALESCE_KEY_PREFIX = 'djackal.coalesce.'
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    run func once per key among concurrent callers in this process,
+    the other callers wait for it and share its result or exception.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, func, timeout=None):
+        """
+        returns (result, shared). a waiter runs func itself after timeout seconds.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            if call.event.wait(timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            return func(), False
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+        return call.result, False
+
+
+single_flight = SingleFlight()
+
+
+def cache_flight(cache, key, func, timeout, result_ttl, poll_interval=0.05):
+    """
+    SingleFlight across processes with a cache lock, result must be picklable.
+    the leader's result is kept for result_ttl seconds for callers arriving late.
+    """
+    result_key = key + ':result'
+    lock_key = key + ':lock'
+
+    result = cache.get(result_key)
+    if result is not None:
+        return result, True
+
+    if cache.add(lock_key, 1, timeout):
+        try:
+            result = func()
+            if result is not None:
+                cache.set(result_key, result, result_ttl)
+            return result, False
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        result = cache.get(result_key)
+        if result is not None:
+            return result, True
+        if cache.get(lock_key) is None:
+            # leader failed
+            break
+    return func(), False
+
+
+def make_coalesce_key(*parts):
+    return COALESCE_KEY_PREFIX + hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def snapshot_response(response):
+    """
+    picklable (status, headers, content, data) of a rendered response.
+    cookies are per client and never part of it.
+    """
+    return response.status_code, list(response.items()), response.content, getattr(response, 'data', None)
+
+
+def restore_response(snapshot):
+    """
+    rendered and finalized copy of a snapshot_response(), `.data` is the leader's data.
+    """
+    status, headers, content, data = snapshot
+    response = HttpResponse(content, status=status)
+    for key, value in headers:
+        response[key] = value
+    response.data = data
+    response.coalesced = True
+    return response
+
+
+def coalesce(key, func):
+    """
+    func returns a snapshot_response(), shared by concurrent callers with the same key,
+    or None when its result must not be shared.
+    uses the COALESCE_CACHE alias, if set, to share across processes.
+    """
+    timeout = djackal_settings.COALESCE_TIMEOUT
+    alias = djackal_settings.COALESCE_CACHE
+    if alias is None:
+        return single_flight.do(key, func, timeout=timeout)
+
+    cache = caches[alias]
+    (result, cache_shared), shared = single_flight.do(
+        key,
+        lambda: cache_flight(cache, key, func, timeout, djackal_settings.COALESCE_RESULT_TTL),
+        timeout=timeout,
+    )
+    return result, shared or cache_shared
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import re
+
+from django.db import DatabaseError, NotSupportedError, connections, transaction
+from django.utils import timezone
+
+from djackal.settings import djackal_settings
+from djackal.utils import normalize_sql
+
+logger = logging.getLogger('djackal.explain')
+
+EXPLAIN_KEY = 'djackal.explain.{}.{}'
+
+# plan lines reading every row of a table, and sorts done outside an index
+SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT ROW)'),
+    'postgresql': re.compile(r'\bSeq Scan\b'),
+    'mysql': re.compile(r'\btype\W+ALL\b|\bFull scan\b|\bTable scan\b'),
+}
+TEMP_SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE'),
+    'postgresql': re.compile(r'^\W*Sort\b', re.MULTILINE),
+    'mysql': re.compile(r'Using (filesort|temporary)|\bSort\b'),
+}
+
+
+def analyze_plan(vendor, plan):
+    """
+    {'scan': bool, 'temp_sort': bool} flags of an EXPLAIN output.
+    """
+    scan = SCAN_PATTERNS.get(vendor)
+    temp_sort = TEMP_SORT_PATTERNS.get(vendor)
+    return {
+        'scan': bool(scan and scan.search(plan)),
+        'temp_sort': bool(temp_sort and temp_sort.search(plan)),
+    }
+
+
+def explain_queryset(queryset):
+    """
+    (plan, flags) of queryset, None if the backend can't explain it.
+    runs in a savepoint so a failing EXPLAIN doesn't break the surrounding transaction.
+    """
+    try:
+        with transaction.atomic(using=queryset.db):
+            plan = queryset.explain()
+    except (NotSupportedError, DatabaseError):
+        logger.debug('EXPLAIN failed', exc_info=True)
+        return None
+    return plan, analyze_plan(connections[queryset.db].vendor, plan)
+
+
+def record_plan(view_name, filters, ordering, plan, flags):
+    """
+    log the plan shape, and keep a per combination record with a sample count
+    in the Storage table when EXPLAIN_STORE is 'storage'.
+    """
+    record = {
+        'view': view_name,
+        'filters': filters,
+        'ordering': ordering,
+        'plan': normalize_sql(plan),
+        **flags,
+    }
+    level = logging.WARNING if flags['scan'] or flags['temp_sort'] else logging.INFO
+    logger.log(level, 'EXPLAIN %s filters=%s ordering=%s scan=%s temp_sort=%s\n%s',
+               view_name, filters, ordering, flags['scan'], flags['temp_sort'], record['plan'])
+
+    if djackal_settings.EXPLAIN_STORE != 'storage':
+        return record
+
+    from djackal.storage.models import Storage
+
+    digest = hashlib.md5(json.dumps([filters, ordering]).encode()).hexdigest()
+    key = EXPLAIN_KEY.format(view_name, digest)[:150]
+    record['samples'] = 1
+    record['last_sampled'] = timezone.now().isoformat()
+    # the row stays locked until the count is written, concurrent samples don't lose counts
+    with transaction.atomic():
+        stored, created = Storage.objects.select_for_update().get_or_create(
+            key=key, defaults={'value': json.dumps(record)}
+        )
+        if not created:
+            record['samples'] = json.loads(stored.value)['samples'] + 1
+            stored.value = json.dumps(record)
+            stored.save(update_fields=['value'])
+    return record
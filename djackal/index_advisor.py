@@ -0,0 +1,248 @@
+import os
+import sysconfig
+from collections import namedtuple
+from inspect import isclass
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import migrations, models
+from django.db.models.constants import LOOKUP_SEP
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from djackal.utils import islist
+
+Usage = namedtuple('Usage', ['view', 'kind', 'param'])
+Suggestion = namedtuple('Suggestion', ['model', 'fields', 'score', 'usages'])
+
+# how much an unindexed usage costs, ordering needs a full sort of the filtered rows
+USAGE_WEIGHTS = {
+    'ordering': 3,
+    'filter': 2,
+    'range': 2,
+    'lookup': 1,
+}
+
+
+def iter_view_classes(urlconf=None):
+    """
+    (route, view class, as_view() initkwargs) of every DjackalAPIView in the URLconf.
+    """
+    from djackal.views.base import DjackalAPIView
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns, prefix + str(pattern.pattern))
+            elif isinstance(pattern, URLPattern):
+                view_class = getattr(pattern.callback, 'view_class', None)
+                if isinstance(view_class, type) and issubclass(view_class, DjackalAPIView):
+                    initkwargs = getattr(pattern.callback, 'view_initkwargs', {})
+                    yield prefix + str(pattern.pattern), view_class, initkwargs
+
+    yield from walk(get_resolver(urlconf).url_patterns, '')
+
+
+def resolve_column(model, lookup):
+    """
+    (model, field name) of the column compared by lookup, None if it is not a plain column.
+    'author__name__icontains' -> (Author, 'name'), 'author__id' -> (model, 'author').
+    """
+    field = None
+    for name in lookup.split(LOOKUP_SEP):
+        if field is not None and not field.is_relation:
+            break
+        if field is not None:
+            if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                return None
+            if name in (field.target_field.name, 'pk'):
+                # compared with the foreign key column itself
+                break
+            model = field.related_model
+        try:
+            field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # lookup or transform like __gte, __date
+            break
+
+    if field is None or not field.concrete or field.many_to_many:
+        return None
+    return model, field.name
+
+
+def _schema_usages(schema):
+    for key, value in schema.items():
+        if type(value) is not dict:
+            kind, fields = 'filter', value
+        else:
+            action = value.get('action', 'filter')
+            if action == 'search' or 'field' not in value:
+                # full text search is served by djackal.search indexes
+                continue
+            kind = 'range' if action == 'range' else 'filter'
+            fields = value['field']
+        # multiple fields are ORed, each needs its own index
+        for field in (fields if islist(fields) else (fields,)):
+            yield key, kind, field
+
+
+def _ordering_options(view_class):
+    options = list(dict(view_class.ordering_map or {}).values())
+    if view_class.ordering_default:
+        options.append(view_class.ordering_default)
+    for option in dict.fromkeys(options):
+        yield option, [name.strip().lstrip('-') for name in option.split(',') if name.strip()]
+
+
+def get_view_candidates(view_class, model):
+    """
+    (model, fields, usage) index candidates of a view.
+    view_class may be a view instance, to read attributes overridden by as_view() initkwargs.
+    equality filters of lookup_map, extra_map and user_field lead each composite index.
+    """
+    name = (view_class if isclass(view_class) else type(view_class)).__name__
+    equal_fields = []
+    equal_lookups = [
+        *dict(view_class.lookup_map or {}).values(),
+        *dict(view_class.extra_map or {}),
+        *([view_class.user_field] if view_class.user_field else []),
+    ]
+    for lookup in equal_lookups:
+        column = resolve_column(model, lookup)
+        if column is None:
+            continue
+        if column[0] is model:
+            equal_fields.append(column[1])
+        else:
+            yield column[0], [column[1]], Usage(name, 'lookup', lookup)
+    equal_fields = list(dict.fromkeys(equal_fields))
+
+    if equal_fields:
+        yield model, equal_fields, Usage(name, 'lookup', ','.join(equal_lookups))
+
+    for key, kind, lookup in _schema_usages(dict(view_class.filter_schema or {})):
+        column = resolve_column(model, lookup)
+        if column is None:
+            continue
+        if column[0] is model:
+            yield model, [*equal_fields, column[1]], Usage(name, kind, key)
+        else:
+            yield column[0], [column[1]], Usage(name, kind, key)
+
+    for option, names in _ordering_options(view_class):
+        columns = [resolve_column(model, name) for name in names]
+        if not columns or any(column is None or column[0] is not model for column in columns):
+            continue
+        yield model, [*equal_fields, *(column[1] for column in columns)], Usage(name, 'ordering', option)
+
+
+def get_existing_indexes(model):
+    """
+    field name lists of the model's existing indexes, leading column first.
+    """
+    opts = model._meta
+    indexes = [[opts.pk.name]]
+    for field in opts.concrete_fields:
+        if field.unique or field.db_index:
+            indexes.append([field.name])
+    for index in opts.indexes:
+        if index.fields:
+            indexes.append([name.lstrip('-') for name in index.fields])
+    for constraint in opts.constraints:
+        if getattr(constraint, 'fields', None):
+            indexes.append(list(constraint.fields))
+    for fields in opts.unique_together:
+        indexes.append(list(fields))
+    return indexes
+
+
+def _is_prefix(fields, index):
+    return len(fields) <= len(index) and list(index[:len(fields)]) == list(fields)
+
+
+def advise(urlconf=None):
+    """
+    suggested indexes of views in the URLconf, highest score first.
+    """
+    candidates = {}
+    for route, view_class, initkwargs in iter_view_classes(urlconf):
+        view = view_class(**initkwargs)
+        model = view.view_config.model
+        if model is None:
+            continue
+        for candidate_model, fields, usage in get_view_candidates(view, model):
+            key = (candidate_model, tuple(fields))
+            candidates.setdefault(key, []).append(usage._replace(view='{} ({})'.format(usage.view, route)))
+
+    suggestions = []
+    for (model, fields), usages in candidates.items():
+        if any(_is_prefix(fields, index) for index in get_existing_indexes(model)):
+            continue
+        score = sum(USAGE_WEIGHTS[usage.kind] for usage in usages)
+        suggestions.append(Suggestion(model, list(fields), score, usages))
+
+    # a composite suggestion also serves the suggestions that are its prefix
+    merged = []
+    for suggestion in sorted(suggestions, key=lambda s: len(s.fields), reverse=True):
+        for i, other in enumerate(merged):
+            if other.model is suggestion.model and _is_prefix(suggestion.fields, other.fields):
+                merged[i] = other._replace(score=other.score + suggestion.score, usages=other.usages + suggestion.usages)
+                break
+        else:
+            merged.append(suggestion)
+
+    return sorted(merged, key=lambda s: (-s.score, s.model._meta.label, s.fields))
+
+
+def build_index(suggestion):
+    index = models.Index(fields=suggestion.fields)
+    index.set_name_with_model(suggestion.model)
+    return index
+
+
+def is_project_app(app_label, base_dir=None):
+    """
+    True if the app lives under base_dir, BASE_DIR setting or the working directory,
+    and is neither an installed package nor one of djackal's own apps.
+    """
+    app_config = apps.get_app_config(app_label)
+    if app_config.name == 'djackal' or app_config.name.startswith('djackal.'):
+        return False
+    base_dir = os.path.realpath(base_dir or getattr(settings, 'BASE_DIR', None) or os.getcwd())
+    path = os.path.realpath(app_config.path)
+    packages = {
+        os.path.realpath(sysconfig.get_paths()[name]) for name in ('purelib', 'platlib')
+    }
+    if any(os.path.commonpath([path, package]) == package for package in packages):
+        return False
+    if {'site-packages', 'dist-packages'}.intersection(path.split(os.sep)):
+        return False
+    return os.path.commonpath([path, base_dir]) == base_dir
+
+
+def build_migrations(suggestions, base_dir=None):
+    """
+    {app_label: Migration} adding the suggested indexes, depending on the app's latest migration.
+    apps without migrations or outside the project, see is_project_app(), are left out.
+    """
+    from django.db.migrations.loader import MigrationLoader
+
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    result = {}
+    for suggestion in suggestions:
+        app_label = suggestion.model._meta.app_label
+        if app_label not in loader.migrated_apps or not is_project_app(app_label, base_dir):
+            continue
+
+        if app_label not in result:
+            leaves = loader.graph.leaf_nodes(app_label)
+            number = max((int(name.split('_')[0]) for _, name in leaves if name.split('_')[0].isdigit()), default=0)
+            migration = migrations.Migration('%04d_djackal_index_advisor' % (number + 1), app_label)
+            migration.dependencies = leaves
+            migration.operations = []
+            result[app_label] = migration
+
+        result[app_label].operations.append(
+            migrations.AddIndex(model_name=suggestion.model._meta.model_name, index=build_index(suggestion))
+        )
+    return result
@@ -0,0 +1,48 @@
+import os
+
+from django.core.management import BaseCommand
+from django.db.migrations.writer import MigrationWriter
+
+from djackal.index_advisor import advise, build_migrations, is_project_app
+
+
+class Command(BaseCommand):
+    help = 'Suggest indexes for filter_schema, lookup and ordering fields of djackal views.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--urlconf', default=None, help='URLconf module, ROOT_URLCONF if omitted')
+        parser.add_argument('--limit', type=int, default=None)
+        parser.add_argument('--emit-migration', action='store_true',
+                            help='write a migration adding the suggested indexes for each app')
+        parser.add_argument('--dry-run', action='store_true', help='print migrations instead of writing')
+        parser.add_argument('--base-dir', default=None,
+                            help='project directory, BASE_DIR setting or the working directory if omitted')
+
+    def handle(self, *args, **options):
+        suggestions = advise(options['urlconf'])[:options['limit']]
+        if not suggestions:
+            print('No index suggestions')
+            return
+
+        for rank, suggestion in enumerate(suggestions, start=1):
+            print('{}. {}({}) score {}'.format(
+                rank, suggestion.model._meta.label, ', '.join(suggestion.fields), suggestion.score
+            ))
+            for usage in suggestion.usages:
+                print('    {} {}: {}'.format(usage.kind, usage.param, usage.view))
+
+        if not options['emit_migration']:
+            return
+
+        for app_label in sorted({suggestion.model._meta.app_label for suggestion in suggestions}):
+            if not is_project_app(app_label, options['base_dir']):
+                print('Skipped {}: app is outside the project, add its indexes by hand'.format(app_label))
+
+        for app_label, migration in build_migrations(suggestions, options['base_dir']).items():
+            writer = MigrationWriter(migration)
+            if options['dry_run']:
+                print(writer.as_string())
+                continue
+            with open(writer.path, 'w', encoding='utf-8') as f:
+                f.write(writer.as_string())
+            print('Created {}'.format(os.path.relpath(writer.path)))
@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand
+
+from djackal.search import get_search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Create missing and rebuild registered djackal full-text search indexes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='app_label.ModelName to rebuild, all if omitted')
+        parser.add_argument('--database', default=None)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        labels = {label.lower() for label in options['models']}
+        indexes = get_search_indexes()
+        if not indexes:
+            print('No search indexes')
+
+        for index in indexes:
+            if labels and index.model._meta.label_lower not in labels:
+                continue
+            count = index.rebuild(using=options['database'], batch_size=options['batch_size'])
+            print('Rebuilt {}: {} rows'.format(index.table_name, count))
@@ -0,0 +1,26 @@
+from django.core.management import BaseCommand
+
+from djackal.model_mixins.aggregate_cache import get_aggregate_cache_models, recompute_aggregate_caches
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized counter and sum cache columns from child tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='app_label.ModelName of child models, all if omitted')
+        parser.add_argument('--database', default=None)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        labels = {label.lower() for label in options['models']}
+        models = get_aggregate_cache_models()
+        if not models:
+            print('No aggregate caches')
+
+        for model in models:
+            if labels and model._meta.label_lower not in labels:
+                continue
+            count = recompute_aggregate_caches(
+                model, using=options['database'], batch_size=options['batch_size']
+            )
+            print('Recomputed {}: {} rows updated'.format(model._meta.label, count))
@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand
+
+from djackal.summary import get_summary_models, refresh_summary
+
+
+class Command(BaseCommand):
+    help = 'Refresh djackal summary tables from their source models.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='app_label.ModelName to refresh, all if omitted')
+        parser.add_argument('--full', action='store_true', help='rebuild every group instead of changed ones')
+        parser.add_argument('--database', default=None)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        labels = {label.lower() for label in options['models']}
+        models = get_summary_models()
+        if not models:
+            print('No summary models')
+
+        for model in models:
+            if labels and model._meta.label_lower not in labels:
+                continue
+            count = refresh_summary(
+                model, full=options['full'], using=options['database'], batch_size=options['batch_size']
+            )
+            print('Refreshed {}: {} rows'.format(model._meta.label, count))
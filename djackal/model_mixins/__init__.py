@@ -1 +1,2 @@
-from .extra_mixin import ExtraMixin
+from .extra_mixin import ExtraMixin, ExtraManager, ExtraQuerySet
+from .aggregate_cache import AggregateCacheMixin, AggregateCacheManager, AggregateCacheQuerySet, CounterCache, SumCache
@@ -0,0 +1,275 @@
+from collections import defaultdict
+
+from django.db import models, router, transaction
+from django.db.models import Count, F
+
+from djackal.expressions import DefaultSum
+
+_aggregate_cache_models = []
+
+
+class CounterCache:
+    """
+    number of child rows, stored in `field` of the parent reached by the `relation` foreign key.
+    """
+
+    def __init__(self, relation, field):
+        self.relation = relation
+        self.field = field
+
+    def get_relation_field(self, model):
+        return model._meta.get_field(self.relation)
+
+    def get_parent_model(self, model):
+        return self.get_relation_field(model).related_model
+
+    def get_attnames(self, model):
+        return [self.get_relation_field(model).attname]
+
+    def get_parent_pk(self, model, values):
+        return values.get(self.get_relation_field(model).attname)
+
+    def get_value(self, model, values):
+        """
+        value added to the parent column, values = {attname: column value} of the child row.
+        """
+        return 1
+
+    def get_aggregate(self):
+        return Count('pk')
+
+
+class SumCache(CounterCache):
+    """
+    sum of child `source` column, stored in `field` of the parent.
+    """
+
+    def __init__(self, relation, field, source):
+        super().__init__(relation, field)
+        self.source = source
+
+    def get_attnames(self, model):
+        return [*super().get_attnames(model), model._meta.get_field(self.source).attname]
+
+    def get_value(self, model, values):
+        return values.get(model._meta.get_field(self.source).attname) or 0
+
+    def get_aggregate(self):
+        return DefaultSum(self.source)
+
+
+def apply_deltas(model, deltas, using=None):
+    """
+    deltas = {(cache, parent_pk): delta}, one F() update per parent and cache.
+    """
+    for (cache, parent_pk), delta in deltas.items():
+        if parent_pk is None or not delta:
+            continue
+        parent_model = cache.get_parent_model(model)
+        parent_model._base_manager.using(using).filter(pk=parent_pk).update(
+            **{cache.field: F(cache.field) + delta}
+        )
+
+
+def collect_deltas(model, objs):
+    deltas = defaultdict(int)
+    for obj in objs:
+        values = obj.get_aggregate_cache_state()
+        for cache in model.aggregate_caches:
+            deltas[cache, cache.get_parent_pk(model, values)] += cache.get_value(model, values)
+    return deltas
+
+
+class AggregateCacheQuerySet(models.QuerySet):
+    """
+    QuerySet that keeps aggregate caches in sync on bulk_create and delete.
+    update() is not tracked, run recompute_aggregate_caches after bulk updates.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            apply_deltas(self.model, collect_deltas(self.model, objs), using=self.db)
+        for obj in objs:
+            obj._aggregate_cache_state = obj.get_aggregate_cache_state()
+        return objs
+
+    def delete(self):
+        model = self.model
+        with transaction.atomic(using=self.db, savepoint=False):
+            deltas = defaultdict(int)
+            for cache in model.aggregate_caches:
+                attname = cache.get_relation_field(model).attname
+                rows = self.order_by().values(attname).annotate(value=cache.get_aggregate())
+                for row in rows:
+                    deltas[cache, row[attname]] -= row['value']
+            result = super().delete()
+            apply_deltas(model, deltas, using=self.db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+AggregateCacheManager = models.Manager.from_queryset(AggregateCacheQuerySet)
+
+
+class AggregateCacheMixin:
+    """
+    aggregate_caches = [
+        CounterCache('post', 'comment_count'),
+        SumCache('post', 'like_total', 'likes'),
+    ]
+
+    Declared on the child model. Parent columns are updated with F() expressions
+    when a child is saved or deleted, so reads on the parent are a plain column fetch.
+    Use AggregateCacheManager as the model manager to cover bulk_create and queryset delete,
+    and the recompute_aggregate_caches command to repair drifted values.
+    """
+    aggregate_caches = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.__dict__.get('aggregate_caches'):
+            _aggregate_cache_models.append(cls)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        obj._aggregate_cache_state = obj.get_aggregate_cache_state()
+        return obj
+
+    def get_aggregate_cache_attnames(self):
+        model = type(self)
+        return list(dict.fromkeys(
+            attname for cache in self.aggregate_caches for attname in cache.get_attnames(model)
+        ))
+
+    def get_aggregate_cache_state(self):
+        """
+        {attname: value} of the loaded cache columns, compared with the saved state to compute deltas.
+        """
+        # deferred fields are left out, loading them here would cost a query per object
+        return {
+            attname: self.__dict__[attname]
+            for attname in self.get_aggregate_cache_attnames() if attname in self.__dict__
+        }
+
+    def get_stored_aggregate_cache_state(self, using=None):
+        """
+        {attname: value} of the row as last saved. columns missing from the recorded state,
+        deferred when the row was loaded, are read from the database.
+        """
+        state = dict(getattr(self, '_aggregate_cache_state', {}))
+        missing = [attname for attname in self.get_aggregate_cache_attnames() if attname not in state]
+        if missing:
+            row = type(self)._base_manager.using(using).filter(pk=self.pk).values(*missing).first()
+            state.update(row or {})
+        return state
+
+    def get_aggregate_cache_deltas(self, sign=1, update_fields=None, using=None):
+        model = type(self)
+        deltas = defaultdict(int)
+        adding = self._state.adding
+        old_state = {} if adding else self.get_stored_aggregate_cache_state(using)
+        if sign < 0:
+            if not old_state:
+                # row is already gone
+                return deltas
+            for cache in self.aggregate_caches:
+                deltas[cache, cache.get_parent_pk(model, old_state)] -= cache.get_value(model, old_state)
+            return deltas
+
+        written = None
+        if update_fields is not None:
+            written = {model._meta.get_field(name).attname for name in update_fields}
+        # columns that are deferred or left out of update_fields keep their stored value
+        new_state = {
+            **old_state,
+            **{attname: value for attname, value in self.get_aggregate_cache_state().items()
+               if adding or written is None or attname in written},
+        }
+        for cache in self.aggregate_caches:
+            if written is not None and written.isdisjoint(cache.get_attnames(model)):
+                continue
+            if old_state:
+                deltas[cache, cache.get_parent_pk(model, old_state)] -= cache.get_value(model, old_state)
+            deltas[cache, cache.get_parent_pk(model, new_state)] += cache.get_value(model, new_state)
+        return deltas
+
+    def save(self, *args, **kwargs):
+        if not self.aggregate_caches:
+            return super().save(*args, **kwargs)
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic(using=using, savepoint=False):
+            if self._state.adding:
+                self._aggregate_cache_state = {}
+            previous = self._aggregate_cache_state if hasattr(self, '_aggregate_cache_state') else {}
+            deltas = self.get_aggregate_cache_deltas(update_fields=update_fields, using=using)
+            result = super().save(*args, **kwargs)
+            apply_deltas(type(self), deltas, using=using)
+
+        state = self.get_aggregate_cache_state()
+        if update_fields is not None:
+            written = {type(self)._meta.get_field(name).attname for name in update_fields}
+            state = {**previous, **{attname: value for attname, value in state.items() if attname in written}}
+        self._aggregate_cache_state = state
+        return result
+
+    def delete(self, *args, **kwargs):
+        if not self.aggregate_caches:
+            return super().delete(*args, **kwargs)
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            deltas = self.get_aggregate_cache_deltas(sign=-1, using=using)
+            result = super().delete(*args, **kwargs)
+            apply_deltas(type(self), deltas, using=using)
+        self._aggregate_cache_state = {}
+        return result
+
+
+def get_aggregate_cache_models():
+    return [model for model in _aggregate_cache_models if not model._meta.abstract]
+
+
+def recompute_aggregate_caches(model, using=None, batch_size=1000):
+    """
+    recompute every aggregate cache of child `model` from the child table, in batches of parents.
+    returns number of parent rows updated.
+    """
+    updated = 0
+    for cache in model.aggregate_caches:
+        relation_field = cache.get_relation_field(model)
+        parent_model = relation_field.related_model
+        parents = parent_model._base_manager.using(using).order_by('pk')
+
+        last_pk = None
+        while True:
+            batch = parents if last_pk is None else parents.filter(pk__gt=last_pk)
+            batch = list(batch.only('pk', cache.field)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            rows = (
+                model._base_manager.using(using)
+                .filter(**{relation_field.attname + '__in': [parent.pk for parent in batch]})
+                .order_by()
+                .values(relation_field.attname)
+                .annotate(value=cache.get_aggregate())
+            )
+            values = {row[relation_field.attname]: row['value'] for row in rows}
+
+            changed = []
+            for parent in batch:
+                value = values.get(parent.pk, 0)
+                if getattr(parent, cache.field) != value:
+                    setattr(parent, cache.field, value)
+                    changed.append(parent)
+            if changed:
+                parent_model._base_manager.using(using).bulk_update(changed, [cache.field])
+            updated += len(changed)
+    return updated
@@ -1,29 +1,112 @@
+from django.db import models
+
+
+class ExtraAttribute:
+    """
+    Descriptor that proxies one key of the model's extra field.
+    ExtraMixin installs one of these per extra key when the class is created.
+    """
+
+    def __init__(self, key, default=None):
+        self.key = key
+        self.default = default
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        extra_hash = getattr(instance, instance.extra_field_name) or dict()
+        value = extra_hash.get(self.key)
+        if value is None and self.default is not None:
+            value = self.default() if callable(self.default) else self.default
+        return value
+
+    def __set__(self, instance, value):
+        extra_hash = getattr(instance, instance.extra_field_name)
+        if not isinstance(extra_hash, dict):
+            extra_hash = dict()
+            setattr(instance, instance.extra_field_name, extra_hash)
+        extra_hash[self.key] = value
+
+
+class ExtraQuerySet(models.QuerySet):
+    """
+    QuerySet that keeps promoted extra columns in sync on bulk operations.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.sync_promoted_fields()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        model = self.model
+        if model.extra_field_name in fields:
+            for obj in objs:
+                obj.sync_promoted_fields()
+            fields += [name for name in model.extra_promoted_fields.values() if name not in fields]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+
+ExtraManager = models.Manager.from_queryset(ExtraQuerySet)
+
+
 class ExtraMixin:
+    """
+    extra_promoted_fields = {
+        'extra_key': 'shadow_column_name',
+    }
+
+    Promoted keys are copied into their shadow column (a regular, indexed
+    model field) on save and bulk_update, and query_filter lookups on the key
+    are rewritten to that column. Use ExtraManager as the model manager to
+    cover bulk operations.
+    """
     extra_fields = ()
     extra_field_name = 'extra'
+    extra_field_keys = ()
+    extra_promoted_fields = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'extra_fields' in cls.__dict__:
+            extra_fields = cls.extra_fields
+            cls.extra_field_keys = tuple(extra_fields)
+            for key in cls.extra_field_keys:
+                default = extra_fields[key] if type(extra_fields) is dict else None
+                setattr(cls, key, ExtraAttribute(key, default=default))
+
+        for key in cls.extra_promoted_fields:
+            if key not in cls.extra_field_keys:
+                raise ValueError(f'promoted key is not in extra_fields: {key}')
+
+    @classmethod
+    def get_promoted_lookup(cls, lookup):
+        """
+        'key__icontains' or 'extra__key__icontains' -> 'shadow_column__icontains'
+        """
+        if not cls.extra_promoted_fields:
+            return lookup
+
+        parts = lookup.split('__')
+        if len(parts) > 1 and parts[0] == cls.extra_field_name and parts[1] in cls.extra_promoted_fields:
+            parts = parts[1:]
+        if parts[0] in cls.extra_promoted_fields:
+            parts[0] = cls.extra_promoted_fields[parts[0]]
+            return '__'.join(parts)
+        return lookup
+
+    def sync_promoted_fields(self):
+        for key, column in self.extra_promoted_fields.items():
+            setattr(self, column, getattr(self, key))
 
-    def __init__(self, *args, **kwargs):
-        self.extra_field_keys = tuple(self.extra_fields)
-        super().__init__(*args, **kwargs)
-
-    def __setattr__(self, key, value):
-        if key in ('extra_fields', 'extra_field_name', 'extra_field_keys'):
-            return super().__setattr__(key, value)
-        if key in self.extra_field_keys:
-            extra_hash = getattr(self, self.extra_field_name) or dict()
-            extra_hash[key] = value
-            return setattr(self, self.extra_field_name, extra_hash)
-        return super().__setattr__(key, value)
-
-    def __getattribute__(self, item):
-        if item in ('extra_fields', 'extra_field_name', 'extra_field_keys'):
-            return super().__getattribute__(item)
-        elif item in self.extra_field_keys:
-            extra_hash = getattr(self, self.extra_field_name) or dict()
-            value = extra_hash.get(item)
-            if value is None and type(self.extra_fields) is dict:
-                default = self.extra_fields[item]
-                value = default() if callable(default) else default
-            return value
-
-        return super().__getattribute__(item)
+    def save(self, *args, **kwargs):
+        if self.extra_promoted_fields:
+            self.sync_promoted_fields()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and self.extra_field_name in update_fields:
+                kwargs['update_fields'] = {*update_fields, *self.extra_promoted_fields.values()}
+        return super().save(*args, **kwargs)
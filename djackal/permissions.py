@@ -16,6 +16,11 @@ class BasePermission(permissions.BasePermission):
     code = None
     status_code = 403
 
+    # Optional `filter_queryset(self, request, view, queryset)` method.
+    # When defined, views apply it to their queryset in SQL and skip the
+    # per-object checks of this permission.
+    filter_queryset = None
+
     def get_message(self, request, view, obj=None):
         return self.message
 
@@ -39,6 +44,13 @@ class BasePermission(permissions.BasePermission):
     def handle_object(self, request, view, obj):
         return True
 
+    def handle_objects(self, request, view, objs):
+        """
+        Batch version of handle_object, called once per list page.
+        Override to check the whole page with a single query.
+        """
+        return all(self.handle_object(request, view, obj) for obj in objs)
+
     def has_permission(self, request, view):
         """
         Return `True` if permission is granted, `False` otherwise.
@@ -63,6 +75,18 @@ class BasePermission(permissions.BasePermission):
         else:
             return False
 
+    def has_objects_permission(self, request, view, objs):
+        """
+        Return `True` if permission is granted for every object, `False` otherwise.
+        """
+        if self.handle_objects(request, view, objs):
+            return True
+
+        if self.hard:
+            self.raise_error(request, view)
+        else:
+            return False
+
 
 class _MethodPermission(BasePermission):
     allow_method = None
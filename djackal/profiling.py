@@ -0,0 +1,118 @@
+import cProfile
+import os
+import pstats
+import random
+import time
+import uuid
+
+from django.core import signing
+from django.core.cache import caches
+
+from djackal.settings import djackal_settings
+
+PROFILE_SALT = 'djackal.profiling'
+PROFILE_NONCE_KEY = 'djackal.profiling.nonce.{}'
+
+
+def make_profile_token(path, user=None):
+    """
+    one-time token for the profile header or query param of a request to path,
+    valid for PROFILE_TOKEN_MAX_AGE seconds. with user, only requests of that user may use it.
+    """
+    return signing.TimestampSigner(salt=PROFILE_SALT).sign_object({
+        'p': path,
+        'u': None if user is None else str(user.pk),
+        'n': uuid.uuid4().hex,
+    })
+
+
+def check_profile_token(token, request):
+    """
+    True if token was made for the path and user of django HttpRequest and is used the first time.
+    """
+    max_age = djackal_settings.PROFILE_TOKEN_MAX_AGE
+    try:
+        data = signing.TimestampSigner(salt=PROFILE_SALT).unsign_object(token, max_age=max_age)
+    except (signing.BadSignature, ValueError):
+        # ValueError for tokens of the old unbound format
+        return False
+
+    if data['p'] != request.path:
+        return False
+    if data['u'] is not None:
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated or str(user.pk) != data['u']:
+            return False
+    # remembered until the token expires, a replayed token is refused
+    cache = caches[djackal_settings.PROFILE_TOKEN_CACHE]
+    return cache.add(PROFILE_NONCE_KEY.format(data['n']), 1, max_age)
+
+
+def get_profile_token(request):
+    """
+    token from header or query param of django HttpRequest, None if not exists.
+    """
+    return (
+        request.META.get(djackal_settings.PROFILE_HEADER)
+        or request.GET.get(djackal_settings.PROFILE_QUERY_PARAM)
+    )
+
+
+def sampled(rate):
+    if not rate:
+        return False
+    return rate >= 1 or random.random() < rate
+
+
+class RequestProfile:
+    def __init__(self, name):
+        self.name = name
+        self.profiler = cProfile.Profile()
+        self.started = None
+        self.duration = None
+        self.enabled = False
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        try:
+            self.profiler.enable()
+            self.enabled = True
+        except ValueError:
+            # another profiler is already active, e.g. a nested view
+            self.enabled = False
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.enabled:
+            self.profiler.disable()
+        self.duration = time.perf_counter() - self.started
+
+    def get_stats(self):
+        return pstats.Stats(self.profiler)
+
+    def summary(self, limit=20):
+        stats = self.get_stats()
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return {
+            'duration': self.duration,
+            'total_calls': stats.total_calls,
+            'functions': [
+                {
+                    'function': '{}:{}({})'.format(*func),
+                    'ncalls': ncalls,
+                    'tottime': tottime,
+                    'cumtime': cumtime,
+                }
+                for func, (_, ncalls, tottime, cumtime, _) in rows
+            ],
+        }
+
+    def dump(self, directory):
+        """
+        write pstats file to directory, readable with `python -m pstats` or snakeviz.
+        """
+        os.makedirs(directory, exist_ok=True)
+        filename = '{}-{}-{}.prof'.format(time.strftime('%Y%m%d%H%M%S'), self.name, uuid.uuid4().hex[:8])
+        path = os.path.join(directory, filename)
+        self.get_stats().dump_stats(path)
+        return path
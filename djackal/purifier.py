@@ -0,0 +1,77 @@
+from puty import Puty, PutyException, skip
+
+MAX_CACHED_PURIFIERS = 256
+
+_purifiers = {}
+
+
+class Purifier(Puty):
+    """
+    Puty with its schema compiled once, so it can be reused across requests.
+    purify() keeps no state on the instance and is safe to share between threads.
+    """
+
+    def __init__(self, schema):
+        super().__init__(schema)
+        self.fields = tuple(self.compile_field(key, field) for key, field in schema.items())
+
+    def compile_field(self, key, field):
+        cleared_field = self.get_clear_field(field)
+        has_rename = 'rename' in cleared_field
+        rename = cleared_field.pop('rename', None)
+        actions = tuple(
+            (getattr(self, 'action_{}'.format(action)), param)
+            for action, param in cleared_field.items()
+        )
+        return key, has_rename, rename, actions
+
+    def purify_item(self, data):
+        result = {}
+        for key, has_rename, rename, actions in self.fields:
+            value = data.get(key)
+            if has_rename:
+                key = self.action_rename(key, value, rename)
+
+            for action, param in actions:
+                value = action(key, value, param)
+                if value is skip:
+                    break
+            if value is skip:
+                continue
+            result[key] = value
+
+        for key, value in data.items():
+            if key in self.schema:
+                continue
+            value = self.action_unknown(key, value, None)
+            if value is skip:
+                continue
+            result[key] = value
+
+        return result
+
+    def purify(self, data, schema=None, many=False):
+        if schema is not None and schema is not self.schema:
+            return Puty(schema).purify(data, many=many)
+
+        if not many:
+            return self.purify_item(data)
+        return [self.purify_item(item) for item in data]
+
+
+def get_purifier(schema):
+    """
+    return compiled Purifier for schema, cached by schema identity.
+    """
+    if schema is None:
+        raise PutyException('Purifying failed: no schema')
+
+    purifier = _purifiers.get(id(schema))
+    if purifier is not None and purifier.schema is schema:
+        return purifier
+
+    purifier = Purifier(schema)
+    if len(_purifiers) >= MAX_CACHED_PURIFIERS:
+        _purifiers.clear()
+    _purifiers[id(schema)] = purifier
+    return purifier
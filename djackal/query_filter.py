@@ -1,3 +1,15 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Count, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import RawSQL
+
+from djackal.search import qf_search
+from djackal.settings import djackal_settings
 from djackal.shortcuts import gen_q
 from djackal.utils import islist
 
@@ -15,6 +27,18 @@ def to_bool(value):
     return checker(value)
 
 
+def promote_field(queryset, field):
+    """
+    rewrite lookups on promoted ExtraMixin keys to their shadow columns
+    """
+    resolver = getattr(queryset.model, 'get_promoted_lookup', None)
+    if resolver is None:
+        return field
+    if islist(field):
+        return tuple(resolver(f) for f in field)
+    return resolver(field)
+
+
 def qf_filter(queryset, field, value, key):
     if islist(field):
         return queryset.filter(gen_q(value, *field))
@@ -40,6 +64,92 @@ def qf_range(queryset, field, value, key):
     )
 
 
+def get_model_field(model, path):
+    """
+    resolve 'author__id' like path to the model field that stores the value.
+    """
+    field = None
+    for name in path.split(LOOKUP_SEP):
+        field = model._meta.get_field(name)
+        if field.is_relation:
+            model = field.related_model
+    if field is not None and field.is_relation and field.many_to_one:
+        field = field.target_field
+    elif field is not None and field.is_relation:
+        field = model._meta.pk
+    return field
+
+
+def get_in_field(queryset, field):
+    """
+    model field compared by an 'in' lookup on field, None for transforms like 'created__date'.
+    """
+    try:
+        return get_model_field(queryset.model, field)
+    except FieldDoesNotExist:
+        return None
+
+
+def coerce_values(queryset, field, values):
+    """
+    deduplicate values and convert them to db values of field, dropping invalid ones.
+    """
+    model_field = get_in_field(queryset, field)
+    if model_field is None:
+        # transforms are passed through as they are
+        return [value for value in dict.fromkeys(values) if value not in (None, '')]
+
+    connection = connections[queryset.db]
+    result = []
+    for value in dict.fromkeys(values):
+        try:
+            value = model_field.to_python(value)
+            if value is None:
+                continue
+            result.append(model_field.get_db_prep_value(value, connection, prepared=False))
+        except (ValidationError, ValueError, TypeError):
+            continue
+    return list(dict.fromkeys(result))
+
+
+def qf_in(queryset, field, value, key):
+    if islist(field):
+        raise ValueError(f'action_in not allow multiple fields: {key}')
+
+    if field.endswith(f'{LOOKUP_SEP}in'):
+        field = field[:-len(f'{LOOKUP_SEP}in')]
+
+    values = value if islist(value) else [value]
+    values = coerce_values(queryset, field, values)
+    threshold = djackal_settings.LARGE_IN_THRESHOLD
+
+    if len(values) <= threshold:
+        return queryset.filter(**{f'{field}__in': values})
+
+    # keep sql text and parameter count constant for large lists, one bound parameter
+    connection = connections[queryset.db]
+    model_field = get_in_field(queryset, field)
+    if connection.vendor == 'sqlite':
+        rhs = RawSQL('SELECT value FROM json_each(%s)', [json.dumps(values, default=str)])
+        return queryset.filter(**{f'{field}__in': rhs})
+    if model_field is not None and connection.vendor == 'postgresql':
+        rhs = RawSQL('SELECT unnest(%s::{}[])'.format(model_field.rel_db_type(connection)), [values])
+        return queryset.filter(**{f'{field}__in': rhs})
+    if model_field is not None and connection.vendor == 'mysql':
+        # JSON_TABLE needs MySQL 8.0.4 or MariaDB 10.6
+        rhs = RawSQL(
+            "SELECT value FROM JSON_TABLE(%s, '$[*]' COLUMNS(value {} PATH '$')) AS djackal_in".format(
+                model_field.rel_db_type(connection)
+            ),
+            [json.dumps(values, default=str)],
+        )
+        return queryset.filter(**{f'{field}__in': rhs})
+
+    # at least each IN list stays under the threshold
+    chunks = (values[i:i + threshold] for i in range(0, len(values), threshold))
+    return queryset.filter(reduce(or_, (Q(**{f'{field}__in': chunk}) for chunk in chunks)))
+
+
 def filtering(queryset, params, schema):
     """
     query_schema = {
@@ -50,7 +160,8 @@ def filtering(queryset, params, schema):
             'allow_null': False,
             'format': format_func,
             'default': 'default_value',
-            'action': 'filter' | 'range'
+            'action': 'filter' | 'range' | 'search' | 'in',
+            'facet': True | 'var',
         }
     }
     """
@@ -63,7 +174,8 @@ def filtering(queryset, params, schema):
         if type(schema_value) is not dict:
             if is_value_none:
                 continue
-            _queryset = qf_filter(_queryset, schema_value, params.get(schema_key, None), schema_key)
+            field = promote_field(_queryset, schema_value)
+            _queryset = qf_filter(_queryset, field, params.get(schema_key, None), schema_key)
             continue
 
         if is_value_none:
@@ -77,7 +189,7 @@ def filtering(queryset, params, schema):
         if 'field' not in schema_value:
             raise ValueError(f"'field' not found in schema: {schema_key}")
 
-        field = schema_value['field']
+        field = promote_field(_queryset, schema_value['field'])
         format_func = schema_value.get('format')
         if format_func:
             param_value = format_func(param_value)
@@ -87,8 +199,55 @@ def filtering(queryset, params, schema):
             action = qf_filter
         elif action == 'range':
             action = qf_range
+        elif action == 'search':
+            action = qf_search
+        elif action == 'in':
+            action = qf_in
         if not callable(action):
             raise ValueError(f'action method not exists: {schema_key}')
 
         _queryset = action(_queryset, field, param_value, schema_key)
     return _queryset
+
+
+def get_facet_field(schema_value):
+    if type(schema_value) is not dict or not schema_value.get('facet'):
+        return None
+
+    facet = schema_value['facet']
+    if facet is not True:
+        return facet
+
+    field = schema_value.get('field')
+    if islist(field):
+        raise ValueError(f'facet field must be given for multiple fields: {field}')
+    for suffix in (f'{LOOKUP_SEP}in', f'{LOOKUP_SEP}exact'):
+        if field.endswith(suffix):
+            return field[:-len(suffix)]
+    return field
+
+
+def faceting(queryset, params, schema):
+    """
+    count rows per value of every facet in schema.
+    each facet is counted with all other filters of schema applied.
+
+    >>> faceting(queryset, params, {'status': {'field': 'status', 'facet': True}})
+    {'status': [{'value': 'open', 'count': 3}, {'value': 'closed', 'count': 1}]}
+    """
+    result = {}
+    for schema_key, schema_value in schema.items():
+        field = get_facet_field(schema_value)
+        if field is None:
+            continue
+
+        other_schema = {key: value for key, value in schema.items() if key != schema_key}
+        rows = (
+            filtering(queryset, params, other_schema)
+            .order_by()
+            .values(field)
+            .annotate(facet_count=Count('pk'))
+            .order_by('-facet_count', field)
+        )
+        result[schema_key] = [{'value': row[field], 'count': row['facet_count']} for row in rows]
+    return result
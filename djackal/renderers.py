@@ -0,0 +1,77 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from djackal.settings import djackal_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONEncoder(DjangoJSONEncoder):
+    """
+    DjangoJSONEncoder that also accepts sets, tuples and generators.
+    """
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            if hasattr(o, '__iter__') and not isinstance(o, (str, bytes)):
+                return list(o)
+            raise
+
+
+def json_dumps(data):
+    """
+    stdlib encoder, same output format as DRF's compact JSONRenderer.
+    """
+    ret = json.dumps(data, cls=FastJSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    return ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+_fast_encoder = FastJSONEncoder()
+
+
+def orjson_dumps(data):
+    """
+    orjson encoder; date and time values go through DjangoJSONEncoder for the same format.
+    """
+    return orjson.dumps(
+        data,
+        default=_fast_encoder.default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+def get_json_dumps():
+    dumps = djackal_settings.JSON_DUMPS
+    if dumps is not None:
+        return dumps
+    return orjson_dumps if orjson is not None else json_dumps
+
+
+def is_json_renderer(renderer_class):
+    return isinstance(renderer_class, type) and issubclass(renderer_class, JSONRenderer)
+
+
+class FastJSONResponse(HttpResponse):
+    """
+    HttpResponse with data already encoded, skipping DRF's renderer.
+    `data` is kept for inspection like rest_framework Response.
+    """
+
+    def __init__(self, data, status=200, headers=None, dumps=None):
+        self.dumps = dumps or get_json_dumps()
+        super().__init__(self.dumps(data), status=status, headers=headers, content_type='application/json')
+        self.data = data
+
+    def encode(self):
+        """
+        encode `data` again after it was changed.
+        """
+        self.content = self.dumps(self.data)
@@ -0,0 +1,64 @@
+from django.core import signing
+
+from djackal.settings import djackal_settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PRIMARY_SALT = 'djackal.routing.primary'
+
+
+def make_primary_token():
+    """
+    signed and timestamped value of the primary cookie and header.
+    """
+    return signing.TimestampSigner(salt=PRIMARY_SALT).sign('1')
+
+
+def check_primary_token(token):
+    """
+    True if token was made by make_primary_token() within PRIMARY_STICKY_SECONDS.
+    """
+    try:
+        signing.TimestampSigner(salt=PRIMARY_SALT).unsign(token, max_age=djackal_settings.PRIMARY_STICKY_SECONDS)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def is_pinned_to_primary(request):
+    """
+    True if the client wrote recently and must read its writes from the primary.
+    request is django HttpRequest.
+    """
+    for token in (
+        request.COOKIES.get(djackal_settings.PRIMARY_STICKY_COOKIE),
+        request.META.get(djackal_settings.PRIMARY_STICKY_HEADER),
+    ):
+        if token and check_primary_token(token):
+            return True
+    return False
+
+
+def pin_to_primary(response):
+    """
+    pin the client to the primary for PRIMARY_STICKY_SECONDS with a cookie and a response header
+    clients without cookies can send back as the PRIMARY_STICKY_HEADER request header.
+    both carry a signed timestamp, so the window holds whatever the client sends back.
+    """
+    seconds = djackal_settings.PRIMARY_STICKY_SECONDS
+    if not seconds:
+        return response
+    token = make_primary_token()
+    response.set_cookie(djackal_settings.PRIMARY_STICKY_COOKIE, token, max_age=seconds, httponly=True)
+    response['X-Djackal-Primary'] = token
+    return response
+
+
+def get_read_database(request, alias=None):
+    """
+    replica alias for reads, None to use the default routing (primary).
+    """
+    alias = alias or djackal_settings.READ_DATABASE
+    if alias is None or is_pinned_to_primary(request):
+        return None
+    return alias
@@ -0,0 +1,336 @@
+import re
+import sqlite3
+
+from django.db import connections, models, router
+from django.db.migrations.operations.base import Operation
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+from djackal.shortcuts import gen_q
+from djackal.utils import islist
+
+SEARCH_RANK = 'search_rank'
+
+_search_indexes = {}
+
+
+def _check_fts5():
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE fts5_check USING fts5(value)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+FTS5_AVAILABLE = _check_fts5()
+
+
+def to_match_expression(value, columns=None):
+    """
+    build a safe FTS5 match expression: every word must appear as a prefix.
+
+    >>> to_match_expression('foo bar', columns=('title',))
+    '{"title"} : ("foo"* "bar"*)'
+    """
+    words = re.findall(r'\w+', value or '')
+    if not words:
+        return None
+    expression = ' '.join('"{}"*'.format(word) for word in words)
+    if columns:
+        return '{{{}}} : ({})'.format(' '.join('"{}"'.format(c) for c in columns), expression)
+    return expression
+
+
+class SearchIndex:
+    """
+    Full-text index over model fields (related paths like 'author__name' are allowed).
+
+    The index is a side table keyed by the model pk, kept in sync by post_save/post_delete
+    signals; rows changed through queryset.update() or related models are picked up by
+    `manage.py rebuild_search_index`. On sqlite it is an FTS5 table, on PostgreSQL a table
+    of one tsvector column per field, each with a GIN index. Other backends fall back
+    to `icontains` matching, which scans the table.
+
+    The table is created by a CreateSearchIndex migration operation or by rebuild_search_index,
+    never on the request path. Until it exists, search falls back to `icontains` as well.
+    """
+
+    def __init__(self, model, fields, table_name=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.table_name = table_name or '{}_fts'.format(model._meta.db_table)
+        # aliases where the index table is known to exist
+        self.ready_aliases = set()
+
+    def __repr__(self):
+        return '<SearchIndex: {} {}>'.format(self.model._meta.label, self.fields)
+
+    def get_vendor(self, using):
+        """
+        'sqlite' or 'postgresql' when the index table is used on this alias, None otherwise.
+        """
+        vendor = connections[using].vendor
+        if not isinstance(self.model._meta.pk, models.IntegerField):
+            return None
+        if vendor == 'sqlite' and FTS5_AVAILABLE:
+            return vendor
+        if vendor == 'postgresql':
+            return vendor
+        return None
+
+    def is_fts(self, using):
+        return self.get_vendor(using) is not None
+
+    def connect(self):
+        uid = 'djackal_search_{}'.format(self.table_name)
+        post_save.connect(self.handle_save, sender=self.model, dispatch_uid=uid, weak=False)
+        post_delete.connect(self.handle_delete, sender=self.model, dispatch_uid=uid, weak=False)
+
+    def disconnect(self):
+        uid = 'djackal_search_{}'.format(self.table_name)
+        post_save.disconnect(sender=self.model, dispatch_uid=uid)
+        post_delete.disconnect(sender=self.model, dispatch_uid=uid)
+
+    def handle_save(self, sender, instance, using, **kwargs):
+        if self.is_fts(using):
+            self.update(instance.pk, using=using)
+
+    def handle_delete(self, sender, instance, using, **kwargs):
+        if self.is_fts(using):
+            self.delete(instance.pk, using=using)
+
+    def _columns(self):
+        return ', '.join('"{}"'.format(field) for field in self.fields)
+
+    def get_create_sql(self, vendor):
+        if vendor == 'sqlite':
+            return ['CREATE VIRTUAL TABLE IF NOT EXISTS "{}" USING fts5({})'.format(
+                self.table_name, self._columns()
+            )]
+        sql = ['CREATE TABLE IF NOT EXISTS "{}" (rowid bigint PRIMARY KEY, {})'.format(
+            self.table_name, ', '.join('"{}" tsvector'.format(field) for field in self.fields)
+        )]
+        for i, field in enumerate(self.fields):
+            sql.append('CREATE INDEX IF NOT EXISTS "{0}_gin{1}" ON "{0}" USING GIN ("{2}")'.format(
+                self.table_name, i, field
+            ))
+        return sql
+
+    def create_table(self, using=None):
+        """
+        create the index table, called by rebuild_search_index and CreateSearchIndex only.
+        """
+        using = using or router.db_for_write(self.model)
+        vendor = self.get_vendor(using)
+        if vendor is None:
+            return
+        with connections[using].cursor() as cursor:
+            for sql in self.get_create_sql(vendor):
+                cursor.execute(sql)
+
+    def table_exists(self, using):
+        """
+        whether the index table exists on alias, never creates it.
+        only a found table is remembered, so one created later is picked up.
+        """
+        if using not in self.ready_aliases:
+            connection = connections[using]
+            with connection.cursor() as cursor:
+                if self.table_name not in connection.introspection.table_names(cursor):
+                    return False
+            self.ready_aliases.add(using)
+        return True
+
+    def _insert(self, cursor, rows, vendor):
+        value_sql = '%s' if vendor == 'sqlite' else 'to_tsvector(%s)'
+        sql = 'INSERT INTO "{}"(rowid, {}) VALUES (%s, {})'.format(
+            self.table_name, self._columns(), ', '.join([value_sql] * len(self.fields))
+        )
+        cursor.executemany(sql, [
+            (pk, *('' if value is None else str(value) for value in values))
+            for pk, *values in rows
+        ])
+
+    def update(self, pk, using=None):
+        using = using or router.db_for_write(self.model)
+        if not self.table_exists(using):
+            return
+        rows = self.model._default_manager.using(using).filter(pk=pk).values_list('pk', *self.fields)
+        with connections[using].cursor() as cursor:
+            cursor.execute('DELETE FROM "{}" WHERE rowid = %s'.format(self.table_name), [pk])
+            self._insert(cursor, rows, self.get_vendor(using))
+
+    def delete(self, pk, using=None):
+        using = using or router.db_for_write(self.model)
+        if not self.table_exists(using):
+            return
+        with connections[using].cursor() as cursor:
+            cursor.execute('DELETE FROM "{}" WHERE rowid = %s'.format(self.table_name), [pk])
+
+    def rebuild(self, using=None, batch_size=1000):
+        using = using or router.db_for_write(self.model)
+        vendor = self.get_vendor(using)
+        if vendor is None:
+            return 0
+
+        count = 0
+        introspection = connections[using].introspection
+        with connections[using].cursor() as cursor:
+            if self.table_name in introspection.table_names(cursor):
+                columns = [column.name for column in introspection.get_table_description(cursor, self.table_name)]
+                if vendor == 'postgresql':
+                    columns = columns[1:]
+                if tuple(columns) != self.fields:
+                    # fields changed since the table was created
+                    cursor.execute('DROP TABLE "{}"'.format(self.table_name))
+            for sql in self.get_create_sql(vendor):
+                cursor.execute(sql)
+            cursor.execute('DELETE FROM "{}"'.format(self.table_name))
+            queryset = self.model._default_manager.using(using).order_by('pk').values_list('pk', *self.fields)
+            last_pk = None
+            while True:
+                batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                rows = list(batch[:batch_size])
+                if not rows:
+                    break
+                self._insert(cursor, rows, vendor)
+                count += len(rows)
+                last_pk = rows[-1][0]
+        return count
+
+    def get_match_sql(self, vendor, value, fields):
+        """
+        (where sql, rank sql, params) matching value in the index table, None if nothing to match.
+        rank sql is a select of the relevance, higher is better, for the outer row `{pk}`.
+        """
+        if vendor == 'sqlite':
+            columns = fields if set(fields) != set(self.fields) else None
+            expression = to_match_expression(value, columns)
+            if expression is None:
+                return None
+            return (
+                '"{0}" MATCH %s'.format(self.table_name),
+                'SELECT -bm25("{0}") FROM "{0}" WHERE "{0}" MATCH %s AND rowid = {{pk}}'.format(self.table_name),
+                [expression],
+            )
+
+        # each field column has its own GIN index, the OR is a bitmap OR of index scans
+        query = 'websearch_to_tsquery(%s)'
+        where = ' OR '.join('"{}" @@ {}'.format(field, query) for field in fields)
+        document = " || ".join('coalesce("{}", \'\')'.format(field) for field in fields)
+        return (
+            '({})'.format(where),
+            'SELECT ts_rank({}, {}) FROM "{}" WHERE rowid = {{pk}}'.format(document, query, self.table_name),
+            [value] * len(fields),
+        )
+
+    def search(self, queryset, value, fields=None, rank=SEARCH_RANK):
+        """
+        filter queryset by value and annotate relevance as `rank` (higher is better).
+        """
+        fields = tuple(fields or self.fields)
+        using = queryset.db
+        vendor = self.get_vendor(using)
+        if vendor is None or not self.table_exists(using):
+            return contains_search(queryset, value, fields, rank=rank)
+
+        match = self.get_match_sql(vendor, value, fields)
+        if match is None:
+            return queryset.none()
+        where, rank_sql, params = match
+
+        opts = self.model._meta
+        quote = connections[using].ops.quote_name
+        queryset = queryset.filter(pk__in=RawSQL(
+            'SELECT rowid FROM "{}" WHERE {}'.format(self.table_name, where), params
+        ))
+        return queryset.annotate(**{rank: RawSQL(
+            rank_sql.format(pk='{}.{}'.format(quote(opts.db_table), quote(opts.pk.column))),
+            params[:1],
+            output_field=models.FloatField(),
+        )})
+
+
+def contains_search(queryset, value, fields, rank=SEARCH_RANK):
+    """
+    fallback without full-text support: OR of icontains, constant rank.
+    """
+    queryset = queryset.filter(gen_q(value, *('{}__icontains'.format(f) for f in fields)))
+    return queryset.annotate(**{rank: models.Value(0.0, output_field=models.FloatField())})
+
+
+class CreateSearchIndex(Operation):
+    """
+    migration operation creating the side table of a SearchIndex:
+
+        operations = [CreateSearchIndex('Article', ('title', 'body'))]
+
+    run `manage.py rebuild_search_index` afterwards to fill it from existing rows.
+    """
+    reduces_to_sql = False
+
+    def __init__(self, model_name, fields, table_name=None):
+        self.model_name = model_name
+        self.fields = tuple(fields)
+        self.table_name = table_name
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def get_index(self, app_label, state, using):
+        model = state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(using, model):
+            return None
+        return SearchIndex(model, self.fields, table_name=self.table_name)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        index = self.get_index(app_label, to_state, schema_editor.connection.alias)
+        vendor = index.get_vendor(schema_editor.connection.alias) if index is not None else None
+        if vendor is not None:
+            for sql in index.get_create_sql(vendor):
+                schema_editor.execute(sql)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        index = self.get_index(app_label, from_state, schema_editor.connection.alias)
+        if index is not None and index.get_vendor(schema_editor.connection.alias) is not None:
+            schema_editor.execute('DROP TABLE IF EXISTS "{}"'.format(index.table_name))
+
+    def describe(self):
+        return 'Create search index on {} ({})'.format(self.model_name, ', '.join(self.fields))
+
+    @property
+    def migration_name_fragment(self):
+        return '{}_search_index'.format(self.model_name.lower())
+
+
+def register_search_index(model, fields, table_name=None):
+    """
+    register and connect a SearchIndex, usually from AppConfig.ready().
+    """
+    index = SearchIndex(model, fields, table_name=table_name)
+    index.connect()
+    _search_indexes.setdefault(model, []).append(index)
+    return index
+
+
+def get_search_index(model, fields=None):
+    """
+    return the registered index of model covering all of fields, or None.
+    """
+    fields = set(fields or ())
+    for index in _search_indexes.get(model, ()):
+        if fields.issubset(index.fields):
+            return index
+    return None
+
+
+def get_search_indexes():
+    return [index for indexes in _search_indexes.values() for index in indexes]
+
+
+def qf_search(queryset, field, value, key):
+    fields = tuple(field) if islist(field) else (field,)
+    index = get_search_index(queryset.model, fields)
+    if index is None:
+        return contains_search(queryset, value, fields)
+    return index.search(queryset, value, fields=fields)
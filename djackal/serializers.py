@@ -1,9 +1,54 @@
+import hashlib
+from weakref import WeakKeyDictionary
+
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
 from rest_framework import serializers
 
+from djackal.settings import djackal_settings
+
+
+class FragmentCacheListSerializer(serializers.ListSerializer):
+    """
+    Meta.list_serializer_class of a BaseModelSerializer with fragment_version_field.
+    cached item representations are fetched with one get_many and only misses are serialized.
+    """
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        child = self.child
+        prefix = child.get_fragment_prefix()
+        keys = [child.get_fragment_key(item, prefix) for item in items]
+
+        cache = caches[djackal_settings.FRAGMENT_CACHE]
+        cached = cache.get_many([key for key in keys if key is not None])
+
+        result = []
+        missing = {}
+        for item, key in zip(items, keys):
+            if key in cached:
+                result.append(cached[key])
+                continue
+            representation = child.to_representation(item)
+            result.append(representation)
+            if key is not None:
+                missing[key] = representation
+
+        if missing:
+            cache.set_many(missing, child.get_fragment_timeout())
+        return result
+
 
 class BaseModelSerializer(serializers.ModelSerializer):
     extra_standard_fields = ()
 
+    # row version column (updated_at, revision, ...) enabling FragmentCacheListSerializer
+    fragment_version_field = None
+    # context keys whose values change the representation, e.g. 'lang'
+    fragment_context_keys = ()
+    fragment_cache_timeout = None
+
     def __new__(cls, *args, **kwargs):
         if kwargs.get('many', False) is True:
             context = kwargs.get('context', {})
@@ -36,8 +81,234 @@ class BaseModelSerializer(serializers.ModelSerializer):
             return self.context.get('user') or self.context.get('current_user')
         return request.user
 
+    def get_fragment_prefix(self):
+        """
+        cache key prefix of this serializer, its current field tree and relevant context.
+        nested serializers are cached with the row, bump the version when they change.
+        """
+        parts = (
+            type(self).__module__,
+            type(self).__qualname__,
+            get_field_tree(self),
+            tuple(self.context.get(key) for key in self.fragment_context_keys),
+        )
+        return 'djackal.fragment.{}.{}'.format(
+            self.Meta.model._meta.label_lower, hashlib.md5(repr(parts).encode()).hexdigest()
+        )
+
+    def get_fragment_key(self, instance, prefix=None):
+        if self.fragment_version_field is None:
+            return None
+        version = getattr(instance, self.fragment_version_field)
+        if version is None or instance.pk is None:
+            return None
+        if hasattr(version, 'isoformat'):
+            version = version.isoformat()
+        return '{}.{}.{}'.format(prefix or self.get_fragment_prefix(), instance.pk, version)
+
+    def get_fragment_timeout(self):
+        if self.fragment_cache_timeout is None:
+            return djackal_settings.FRAGMENT_CACHE_TIMEOUT
+        return self.fragment_cache_timeout
+
     def build_field(self, field_name, info, model_class, *args, **kwargs):
         model_field = model_class._meta.get_field(field_name)
         if model_field.__class__ in self.extra_standard_fields:
             return self.build_standard_field(field_name, model_field)
         return super().build_field(field_name, info, model_class, *args, **kwargs)
+
+
+def parse_sparse_fields(value):
+    """
+    'id,name,owner.name' -> {'id': {}, 'name': {}, 'owner': {'name': {}}}
+    value may be a list when the query param is given multiple times.
+    """
+    if isinstance(value, (list, tuple)):
+        value = ','.join(value)
+
+    tree = {}
+    for path in value.split(','):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for name in path.split('.'):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _get_child_serializer(field):
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+
+def get_field_tree(serializer):
+    """
+    (name, subtree) pairs of the current serializer fields, nested serializers included,
+    so sparse trims of nested fields change the tree.
+    """
+    tree = []
+    for name, field in _get_child_serializer(serializer).fields.items():
+        child = _get_child_serializer(field)
+        tree.append((name, get_field_tree(child) if child is not None else None))
+    return tuple(tree)
+
+
+def _invalid_paths(serializer, tree, prefix=''):
+    invalid = []
+    fields = serializer.fields
+    for name, subtree in tree.items():
+        path = prefix + name
+        if name not in fields:
+            invalid.append(path)
+        elif subtree:
+            child = _get_child_serializer(fields[name])
+            if child is None:
+                invalid.append(path)
+            else:
+                invalid.extend(_invalid_paths(child, subtree, path + '.'))
+    return invalid
+
+
+def _trim_fields(serializer, include, exclude):
+    fields = serializer.fields
+    for name in list(fields):
+        if include and name not in include:
+            fields.pop(name)
+            continue
+        sub_include = include.get(name) if include else None
+        sub_exclude = exclude.get(name) if exclude else None
+        if exclude and name in exclude and not sub_exclude:
+            fields.pop(name)
+            continue
+        if sub_include or sub_exclude:
+            _trim_fields(_get_child_serializer(fields[name]), sub_include, sub_exclude)
+
+
+def trim_serializer_fields(serializer, include=None, exclude=None):
+    """
+    remove serializer fields in place, include and exclude are trees from parse_sparse_fields().
+    returns list of unknown field paths and trims nothing if there is one.
+    """
+    serializer = _get_child_serializer(serializer)
+    invalid = _invalid_paths(serializer, include or {}) + _invalid_paths(serializer, exclude or {})
+    if invalid:
+        return invalid
+    _trim_fields(serializer, include, exclude)
+    return []
+
+
+def get_select_related_paths(queryset):
+    """
+    select_related() paths of queryset as 'a__b', True if select_related() was called without fields.
+    """
+    select_related = queryset.query.select_related
+    if select_related is True:
+        return True
+
+    paths = set()
+
+    def walk(tree, prefix):
+        for name, subtree in tree.items():
+            path = prefix + name
+            paths.add(path)
+            walk(subtree, path + '__')
+
+    walk(select_related or {}, '')
+    return paths
+
+
+def get_field_columns(field, model, select_related=(), prefix='', ignore_unresolved=False):
+    """
+    `.only()` paths read by a serializer field, None if they can't be resolved.
+    """
+    if isinstance(field, serializers.SerializerMethodField):
+        return None
+
+    if field.source == '*':
+        child = _get_child_serializer(field)
+        if child is None:
+            return None
+        return get_serializer_columns(child, model, select_related, prefix, ignore_unresolved)
+
+    columns = set()
+    current_model = model
+    path = prefix
+    model_field = None
+    for attr in field.source_attrs:
+        opts = current_model._meta
+        try:
+            model_field = opts.pk if attr == 'pk' else opts.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+
+        if not model_field.concrete or model_field.many_to_many:
+            # reverse and many to many relations are loaded by another query with pk
+            return columns
+
+        name = path + model_field.name
+        columns.add(name)
+        if not model_field.is_relation:
+            return columns
+
+        if select_related is not True and name not in select_related:
+            # related object is loaded by another query with the foreign key
+            return columns
+        current_model = model_field.related_model
+        path = name + '__'
+
+    child = _get_child_serializer(field)
+    if child is not None and model_field is not None and model_field.is_relation:
+        nested = get_serializer_columns(child, current_model, select_related, path, ignore_unresolved)
+        if nested is not None:
+            columns.update(nested)
+        else:
+            columns.add(path + current_model._meta.pk.name)
+            columns.update(path + f.name for f in current_model._meta.concrete_fields)
+    return columns
+
+
+def get_serializer_columns(serializer, model=None, select_related=(), prefix='', ignore_unresolved=False):
+    """
+    concrete model columns read by serializer's readable fields as `.only()` paths.
+    returns None when any field reads something other than columns,
+    e.g. SerializerMethodField, source='*' or a model property,
+    unless ignore_unresolved is set because the caller adds those columns itself.
+    """
+    serializer = _get_child_serializer(serializer)
+    if model is None:
+        model = serializer.Meta.model
+
+    columns = set()
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        field_columns = get_field_columns(field, model, select_related, prefix, ignore_unresolved)
+        if field_columns is None:
+            if ignore_unresolved:
+                continue
+            return None
+        columns.update(field_columns)
+    return columns
+
+
+_serializer_columns = WeakKeyDictionary()
+
+
+def get_serializer_class_columns(serializer_class, model, select_related=(), ignore_unresolved=False):
+    """
+    get_serializer_columns() of serializer_class with its declared fields, computed once per class.
+    serializers whose fields depend on context should not rely on this.
+    """
+    class_columns = _serializer_columns.get(serializer_class)
+    if class_columns is None:
+        class_columns = _serializer_columns.setdefault(serializer_class, {})
+
+    key = (model, frozenset(select_related), ignore_unresolved)
+    if key not in class_columns:
+        columns = get_serializer_columns(serializer_class(), model, select_related, ignore_unresolved=ignore_unresolved)
+        class_columns[key] = None if columns is None else frozenset(columns)
+    return class_columns[key]
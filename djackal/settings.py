@@ -13,6 +13,37 @@ DEFAULTS = {
 
     'DEFAULT_NONE_VALUES': ([], {}, '', None),
 
+    'LARGE_IN_THRESHOLD': 500,
+
+    'PROFILE_ALLOW_TOKEN': False,
+    'PROFILE_HEADER': 'HTTP_X_DJACKAL_PROFILE',
+    'PROFILE_QUERY_PARAM': '_profile',
+    'PROFILE_TOKEN_MAX_AGE': 3600,
+    # cache remembering used profile tokens
+    'PROFILE_TOKEN_CACHE': 'default',
+    'PROFILE_SAMPLE_RATE': 1.0,
+    'PROFILE_DIR': None,
+    'PROFILE_IN_META': False,
+
+    'JSON_DUMPS': None,
+
+    'EXPLAIN_SAMPLE_RATE': 0,
+    'EXPLAIN_STORE': 'log',
+
+    'COALESCE_CACHE': None,
+    'COALESCE_TIMEOUT': 10,
+    'COALESCE_RESULT_TTL': 1,
+
+    'FRAGMENT_CACHE': 'default',
+    'FRAGMENT_CACHE_TIMEOUT': 300,
+
+    'SYNC_TOKEN_MAX_AGE': 60 * 60 * 24 * 30,
+
+    'READ_DATABASE': None,
+    'PRIMARY_STICKY_SECONDS': 5,
+    'PRIMARY_STICKY_COOKIE': 'djackal_primary',
+    'PRIMARY_STICKY_HEADER': 'HTTP_X_DJACKAL_PRIMARY',
+
     'INITIALIZER': None,
 
     'SINGLE_APP': False,
@@ -22,6 +53,7 @@ DEFAULTS = {
 IMPORT_STRINGS = [
     'DEFAULT_PAGINATION_CLASS',
     'EXCEPTION_HANDLER',
+    'JSON_DUMPS',
 ]
 
 
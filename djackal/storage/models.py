@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Max
+from django.utils import timezone
 
 from djackal.shortcuts import get_object_or
 
@@ -27,3 +29,48 @@ class Storage(models.Model):
     def remove(cls, key):
         cls.objects.filter(key=key).delete()
 
+
+PRUNED_ID_KEY = 'djackal.sync.pruned_id'
+
+
+class DeletionLog(models.Model):
+    """
+    tombstones of deleted rows for delta sync, see djackal.sync.register_deletion_log().
+    """
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    # scope field values of the row when it was deleted or left the scope
+    scope = models.JSONField(default=dict)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'id'], name='storage_deletionlog_model_id'),
+            models.Index(fields=['deleted_at'], name='storage_deletionlog_deleted'),
+        ]
+
+    @classmethod
+    def last_id(cls, using=None):
+        last = cls.objects.using(using).order_by('-id').values_list('id', flat=True).first()
+        return last or 0
+
+    @classmethod
+    def pruned_id(cls):
+        stored = Storage.get(PRUNED_ID_KEY)
+        return int(stored.value) if stored is not None else 0
+
+    @classmethod
+    def prune(cls, before):
+        """
+        remove tombstones deleted before datetime `before`.
+        sync tokens issued before the last removed tombstone are refused afterwards.
+        """
+        with transaction.atomic():
+            queryset = cls.objects.filter(deleted_at__lt=before)
+            last_id = queryset.aggregate(value=Max('id'))['value']
+            if last_id is None:
+                return 0
+            if last_id > cls.pruned_id():
+                Storage.set(PRUNED_ID_KEY, str(last_id))
+            return queryset.filter(id__lte=last_id).delete()[0]
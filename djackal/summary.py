@@ -0,0 +1,158 @@
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.db import models, transaction
+from django.db.models import F, Max, Q
+
+from djackal.shortcuts import get_model
+
+_summary_models = []
+
+WATERMARK_KEY = 'djackal.summary.{}'
+
+
+class SummaryModel(models.Model):
+    """
+    class DailySales(SummaryModel):
+        day = models.DateField()
+        user_id = models.IntegerField()
+        total = models.IntegerField()
+        count = models.IntegerField()
+
+        summary_source = 'shop.Order'
+        summary_dimensions = {'day': TruncDate('created_at'), 'user_id': 'user_id'}
+        summary_aggregates = {'total': DefaultSum('amount'), 'count': Count('pk')}
+        summary_watermark = 'updated_at'
+
+    Pre-aggregated rows of summary_source grouped by summary_dimensions.
+    refresh_summary() recomputes only the groups having source rows with summary_watermark
+    above the last refresh, so the watermark column must grow on insert and update.
+    summary_watermark is required, 'id' only fits sources whose rows are never updated.
+    Deleted source rows are only reflected by a full refresh.
+    """
+    summary_source = None
+    summary_dimensions = {}
+    summary_aggregates = {}
+    summary_watermark = None
+
+    class Meta:
+        abstract = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.summary_source is not None and not cls.summary_watermark:
+            raise ValueError(f'summary_watermark is required with summary_source: {cls.__qualname__}')
+        _summary_models.append(cls)
+
+    @classmethod
+    def get_source_model(cls):
+        if isinstance(cls.summary_source, str):
+            return get_model(cls.summary_source)
+        return cls.summary_source
+
+    @classmethod
+    def get_dimension_expressions(cls):
+        return {
+            key: F(value) if isinstance(value, str) else value
+            for key, value in cls.summary_dimensions.items()
+        }
+
+    @classmethod
+    def get_dimension_queryset(cls, queryset):
+        """
+        source queryset with a `_summary_<key>` value per dimension.
+        """
+        annotations = {'_summary_' + key: value for key, value in cls.get_dimension_expressions().items()}
+        return queryset.order_by().annotate(**annotations).values(*annotations)
+
+    @classmethod
+    def get_grouped_queryset(cls, queryset):
+        return cls.get_dimension_queryset(queryset).annotate(**cls.summary_aggregates)
+
+    @classmethod
+    def get_group_filter(cls, groups):
+        return reduce(or_, (
+            Q(**{'_summary_' + key: value for key, value in group.items()}) for group in groups
+        ))
+
+    @classmethod
+    def get_watermark_key(cls):
+        return WATERMARK_KEY.format(cls._meta.label_lower)
+
+
+def get_summary_models():
+    return [model for model in _summary_models if not model._meta.abstract]
+
+
+def _load_watermark(model):
+    from djackal.storage.models import Storage
+
+    stored = Storage.get(model.get_watermark_key())
+    if stored is None:
+        return None
+    field = model.get_source_model()._meta.get_field(model.summary_watermark)
+    return field.to_python(stored.value)
+
+
+def _save_watermark(model, value):
+    from djackal.storage.models import Storage
+
+    if value is None:
+        Storage.remove(model.get_watermark_key())
+    else:
+        Storage.set(model.get_watermark_key(), value.isoformat() if hasattr(value, 'isoformat') else str(value))
+
+
+def _write_groups(model, rows, using, batch_size):
+    dimensions = list(model.summary_dimensions)
+    rows = iter(rows)
+    written = 0
+    while True:
+        objs = [
+            model(**{key: row['_summary_' + key] for key in dimensions},
+                  **{key: row[key] for key in model.summary_aggregates})
+            for row in islice(rows, batch_size)
+        ]
+        if not objs:
+            return written
+        model._base_manager.using(using).bulk_create(objs)
+        written += len(objs)
+
+
+def refresh_summary(model, full=False, using=None, batch_size=500):
+    """
+    recompute summary groups touched since the last watermark, all groups if full.
+    returns number of summary rows written.
+    """
+    source = model.get_source_model()._base_manager.using(using)
+    dimensions = list(model.summary_dimensions)
+
+    with transaction.atomic(using=using):
+        watermark = None if full else _load_watermark(model)
+        new_watermark = source.aggregate(value=Max(model.summary_watermark))['value']
+
+        if watermark is None:
+            model._base_manager.using(using).all().delete()
+            written = _write_groups(model, model.get_grouped_queryset(source).iterator(), using, batch_size)
+            _save_watermark(model, new_watermark)
+            return written
+
+        if new_watermark is None or new_watermark <= watermark:
+            return 0
+
+        changed = model.get_dimension_queryset(source.filter(**{
+            model.summary_watermark + '__gt': watermark,
+            model.summary_watermark + '__lte': new_watermark,
+        })).distinct()
+        changed = [{key: row['_summary_' + key] for key in dimensions} for row in changed]
+
+        written = 0
+        for start in range(0, len(changed), batch_size):
+            groups = changed[start:start + batch_size]
+            model._base_manager.using(using).filter(reduce(or_, (Q(**group) for group in groups))).delete()
+            rows = model.get_grouped_queryset(source).filter(model.get_group_filter(groups))
+            written += _write_groups(model, rows, using, batch_size)
+
+        _save_watermark(model, new_watermark)
+        return written
@@ -0,0 +1,218 @@
+from django.core import signing
+from django.db.models import Q
+from django.db.models.expressions import Col
+from django.db.models.lookups import Exact, In
+from django.db.models.signals import post_delete, pre_save
+from django.db.models.sql.where import AND, ExtraWhere, WhereNode
+
+from djackal.exceptions import BadRequest
+from djackal.settings import djackal_settings
+
+SYNC_SALT = 'djackal.sync'
+
+_scope_fields = {}
+
+
+def _scope_value(value):
+    return None if value is None else str(value)
+
+
+def get_scope(instance, attnames):
+    return {attname: _scope_value(getattr(instance, attname)) for attname in attnames}
+
+
+def _log_deletion(sender, instance, **kwargs):
+    from djackal.storage.models import DeletionLog
+
+    DeletionLog.objects.using(kwargs.get('using')).create(
+        model=sender._meta.label_lower, object_id=str(instance.pk),
+        scope=get_scope(instance, _scope_fields.get(sender, ())),
+    )
+
+
+def _log_scope_change(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    from djackal.storage.models import DeletionLog
+
+    attnames = _scope_fields.get(sender)
+    if raw or not attnames or instance._state.adding or instance.pk is None:
+        return
+    # deferred or unlisted columns are not written
+    written = [
+        attname for attname in attnames
+        if attname in instance.__dict__ and (update_fields is None or attname in update_fields)
+    ]
+    if not written:
+        return
+
+    old = sender._base_manager.using(using).filter(pk=instance.pk).values(*attnames).first()
+    if old is None:
+        return
+    old_scope = {attname: _scope_value(value) for attname, value in old.items()}
+    if any(old_scope[attname] != _scope_value(instance.__dict__[attname]) for attname in written):
+        DeletionLog.objects.using(using).create(
+            model=sender._meta.label_lower, object_id=str(instance.pk), scope=old_scope,
+        )
+
+
+def register_deletion_log(model, scope_fields=()):
+    """
+    record a DeletionLog row for each deleted instance of model, usually from AppConfig.ready().
+
+    scope_fields are columns partitioning what clients see, like an owner or tenant.
+    their values are stored with each tombstone, and a row whose scope value changes gets
+    a tombstone for its old scope, at the cost of one select per save.
+    sync_list() only returns tombstones matching the equality filters of the view's queryset
+    on these columns.
+    """
+    label = model._meta.label_lower
+    post_delete.connect(_log_deletion, sender=model, dispatch_uid='djackal.sync.' + label)
+    if scope_fields:
+        _scope_fields[model] = [model._meta.get_field(name).attname for name in scope_fields]
+        pre_save.connect(_log_scope_change, sender=model, dispatch_uid='djackal.sync.scope.' + label)
+
+
+def get_last_deletion_id(using=None):
+    from djackal.storage.models import DeletionLog
+
+    return DeletionLog.last_id(using=using)
+
+
+class _UnknownScope(Exception):
+    pass
+
+
+def _iter_cols(expression):
+    if isinstance(expression, Col):
+        yield expression
+        return
+    for source in expression.get_source_expressions():
+        if source is not None:
+            yield from _iter_cols(source)
+
+
+def _is_scope_col(col, query, attnames):
+    """
+    True if col is a scope column of the base table or is reached by a join through one.
+    """
+    alias = col.alias
+    attname = col.target.attname
+    while alias != query.base_table:
+        join = query.alias_map[alias]
+        alias = join.parent_alias
+        attname = getattr(join.join_field, 'attname', None)
+    return attname in attnames
+
+
+def _touches_scope(node, query, attnames):
+    if isinstance(node, ExtraWhere):
+        # raw sql, can't tell which columns it reads
+        return True
+    return any(_is_scope_col(col, query, attnames) for col in _iter_cols(node))
+
+
+def _lookup_scope(lookup, query, attnames):
+    """
+    (attname, allowed values) of an equality or in lookup on a scope column, None otherwise.
+    """
+    if not isinstance(lookup, (Exact, In)) or not isinstance(lookup.lhs, Col):
+        return None
+    if lookup.lhs.alias != query.base_table or lookup.lhs.target.attname not in attnames:
+        return None
+    if hasattr(lookup.rhs, 'resolve_expression') or hasattr(lookup.rhs, 'query'):
+        return None
+    values = lookup.rhs if isinstance(lookup, In) else [lookup.rhs]
+    return lookup.lhs.target.attname, {_scope_value(getattr(value, 'pk', value)) for value in values}
+
+
+def _where_scope(node, query, attnames, scope):
+    """
+    raise _UnknownScope when a scope column is filtered by anything else than ANDed equality or in.
+    """
+    if node.connector != AND or node.negated:
+        if _touches_scope(node, query, attnames):
+            raise _UnknownScope
+        return
+    for child in node.children:
+        if isinstance(child, WhereNode):
+            _where_scope(child, query, attnames, scope)
+            continue
+        lookup_scope = _lookup_scope(child, query, attnames)
+        if lookup_scope is None:
+            if _touches_scope(child, query, attnames):
+                raise _UnknownScope
+            continue
+        attname, values = lookup_scope
+        scope[attname] = scope[attname] & values if attname in scope else values
+
+
+def get_queryset_scope(queryset):
+    """
+    {attname: allowed values} of the scope fields from the equality and in filters ANDed in queryset.
+    None if the scope fields are filtered in another way, e.g. in an OR, a negation or a join.
+    """
+    attnames = _scope_fields.get(queryset.model)
+    scope = {}
+    if attnames:
+        try:
+            _where_scope(queryset.query.where, queryset.query, attnames, scope)
+        except _UnknownScope:
+            return None
+    return scope
+
+
+def get_deleted_ids(model, after_id, until_id, queryset=None, using=None):
+    """
+    object ids of model deleted with DeletionLog id in (after_id, until_id].
+    with queryset, only tombstones whose scope values match the queryset filters, read from
+    the queryset's database. none when its scope can't be told, rather than leak other scopes.
+    """
+    from djackal.storage.models import DeletionLog
+
+    if queryset is not None and using is None:
+        using = queryset.db
+    tombstones = DeletionLog.objects.using(using).filter(
+        model=model._meta.label_lower, id__gt=after_id, id__lte=until_id
+    )
+    if queryset is not None:
+        scope = get_queryset_scope(queryset)
+        if scope is None:
+            return []
+        for attname, values in scope.items():
+            tombstones = tombstones.filter(**{'scope__{}__in'.format(attname): list(values)})
+    return list(dict.fromkeys(tombstones.order_by('id').values_list('object_id', flat=True)))
+
+
+def make_sync_token(value, pk, deletion_id):
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return signing.dumps({'v': value, 'p': pk, 'd': deletion_id}, salt=SYNC_SALT, compress=True)
+
+
+def load_sync_token(token, model, field):
+    """
+    (value, pk, deletion id) of a token, raise BadRequest if it is invalid or expired.
+    """
+    try:
+        data = signing.loads(token, salt=SYNC_SALT, max_age=djackal_settings.SYNC_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        raise BadRequest(message='invalid sync token, sync from the beginning', code='SYNC_TOKEN_INVALID')
+
+    from djackal.storage.models import DeletionLog
+
+    if data['d'] < DeletionLog.pruned_id():
+        # tombstones after the token were pruned, deletions would be missed
+        raise BadRequest(message='sync token expired, sync from the beginning', code='SYNC_TOKEN_EXPIRED')
+
+    value = data['v']
+    if value is not None:
+        value = model._meta.get_field(field).to_python(value)
+    return value, data['p'], data['d']
+
+
+def filter_since(queryset, field, value, pk):
+    """
+    rows after (value, pk) in (field, pk) order.
+    """
+    if value is None:
+        return queryset
+    return queryset.filter(Q(**{field + '__gt': value}) | Q(**{field: value, 'pk__gt': pk}))
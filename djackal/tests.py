@@ -1,7 +1,69 @@
+import statistics
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.db.models import QuerySet
 from django.test import TransactionTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
+from djackal.utils import normalize_sql
+
+
+def _format_queries(queries):
+    return '\n'.join('{}. {}'.format(i, query['sql']) for i, query in enumerate(queries, start=1))
+
+
+class _QueryAssertion(ABC):
+    def __init__(self, test_case, using=DEFAULT_DB_ALIAS):
+        self.test_case = test_case
+        self.using = using
+        self.context = None
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.check(self.context.captured_queries)
+
+    @abstractmethod
+    def check(self, queries):
+        """
+        fail self.test_case if the captured queries don't pass.
+        """
+
+
+class _MaxQueries(_QueryAssertion):
+    def __init__(self, test_case, num, using=DEFAULT_DB_ALIAS):
+        super().__init__(test_case, using=using)
+        self.num = num
+
+    def check(self, queries):
+        if len(queries) > self.num:
+            self.test_case.fail('{} queries executed, at most {} expected\nCaptured queries were:\n{}'.format(
+                len(queries), self.num, _format_queries(queries)
+            ))
+
+
+class _NoDuplicateQueries(_QueryAssertion):
+    def __init__(self, test_case, allowed=1, using=DEFAULT_DB_ALIAS):
+        super().__init__(test_case, using=using)
+        self.allowed = allowed
+
+    def check(self, queries):
+        counter = Counter(normalize_sql(query['sql']) for query in queries)
+        duplicates = [(sql, count) for sql, count in counter.most_common() if count > self.allowed]
+        if duplicates:
+            self.test_case.fail('duplicated queries executed (possible N+1):\n{}'.format(
+                '\n'.join('{}x {}'.format(count, sql) for sql, count in duplicates)
+            ))
+
 
 class _TestMixin:
     def assertLen(self, length, seq):
@@ -18,6 +80,39 @@ class _TestMixin:
     def assertStatusCode(self, code, response):
         assert code == response.status_code
 
+    def assertMaxQueries(self, num, using=DEFAULT_DB_ALIAS):
+        """
+        with self.assertMaxQueries(3):
+            ...
+        """
+        return _MaxQueries(self, num, using=using)
+
+    def assertNoDuplicateQueries(self, allowed=1, using=DEFAULT_DB_ALIAS):
+        """
+        fail when the same query, ignoring parameters, runs more than `allowed` times.
+        """
+        return _NoDuplicateQueries(self, allowed=allowed, using=using)
+
+    def assertMaxDuration(self, seconds, func, *args, warmup=1, repeat=5, **kwargs):
+        """
+        call func `warmup` times untimed, then `repeat` times and compare the median duration.
+        """
+        for _ in range(warmup):
+            func(*args, **kwargs)
+
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(*args, **kwargs)
+            durations.append(time.perf_counter() - start)
+
+        median = statistics.median(durations)
+        if median > seconds:
+            self.fail('median duration {:.6f}s exceeded {:.6f}s (min {:.6f}s, max {:.6f}s)'.format(
+                median, seconds, min(durations), max(durations)
+            ))
+        return median
+
 
 class DjackalAPITestCase(APITestCase, _TestMixin):
     pass
@@ -1,5 +1,10 @@
+import re
 from collections.abc import Iterable
 
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'IN \((?:\?(?:, )?)+\)')
+
 
 def value_mapper(a_dict, b_dict):
     """
@@ -35,3 +40,12 @@ def isiter(arg):
     check arg is list or tuple or set or dict not str
     """
     return isinstance(arg, Iterable) and not isinstance(arg, str)
+
+
+def normalize_sql(sql):
+    """
+    replace literals so queries that differ only in parameters compare equal.
+    """
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    return _IN_LIST.sub('IN (...)', sql)
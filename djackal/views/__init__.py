@@ -1,3 +1,4 @@
 from .base import DjackalAPIView
 from .generics import *
 from .mixins import *
+from .batch import *
@@ -1,12 +1,24 @@
+import os
 from functools import cached_property
 
-from puty import purify
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from djackal import query_filter
+from djackal.coalesce import coalesce, make_coalesce_key, restore_response, snapshot_response
+from djackal.exceptions import BadRequest, NotFound
+from djackal.explain import explain_queryset, record_plan
+from djackal.profiling import RequestProfile, check_profile_token, get_profile_token, sampled
+from djackal.purifier import get_purifier
+from djackal.renderers import FastJSONResponse
+from djackal.routing import SAFE_METHODS, get_read_database, is_pinned_to_primary, pin_to_primary
+from djackal.serializers import (
+    get_select_related_paths, get_serializer_class_columns, get_serializer_columns, parse_sparse_fields,
+    trim_serializer_fields
+)
 from djackal.settings import djackal_settings
 from djackal.utils import value_mapper
+from djackal.views.config import VIEW_CONFIG_ATTRIBUTES, build_view_config
 
 
 class QueryFilterMixin:
@@ -22,21 +34,30 @@ class QueryFilterMixin:
     user_field = None
     bind_user_field = None
 
+    # fraction of requests whose filtered queryset EXPLAIN is recorded, EXPLAIN_SAMPLE_RATE setting if None
+    explain_sample_rate = None
+    # set per request by DjackalAPIView.initial(), cleared once the plan is sampled
+    explain_pending = False
+
     def get_lookup_map(self, **additional):
-        d = self.lookup_map or dict()
-        return {**d, **additional}
+        if additional:
+            return {**self.view_config.lookup_map, **additional}
+        return self.view_config.lookup_map
 
     def get_filter_schema(self, **additional):
-        d = self.filter_schema or dict()
-        return {**d, **additional}
+        if additional:
+            return {**self.view_config.filter_schema, **additional}
+        return self.view_config.filter_schema
 
     def get_extra_map(self, **additional):
-        d = self.extra_map or dict()
-        return {**d, **additional}
+        if additional:
+            return {**self.view_config.extra_map, **additional}
+        return self.view_config.extra_map
 
     def get_ordering_map(self, **additional):
-        d = self.ordering_map or dict()
-        return {**d, **additional}
+        if additional:
+            return {**self.view_config.ordering_map, **additional}
+        return self.view_config.ordering_map
 
     def get_user_field(self):
         return self.user_field
@@ -61,6 +82,13 @@ class QueryFilterMixin:
             extra_map = self.get_extra_map()
         return queryset.filter(**extra_map)
 
+    def query_by_permissions(self, queryset):
+        for permission in self.get_permissions():
+            filter_queryset = getattr(permission, 'filter_queryset', None)
+            if filter_queryset is not None:
+                queryset = filter_queryset(self.request, self, queryset)
+        return queryset
+
     def query_by_filter_schema(self, queryset, filter_schema=None):
         params = self.get_query_params_dict()
         if filter_schema is None:
@@ -88,28 +116,90 @@ class QueryFilterMixin:
         order_by = order_value.split(',')
         return queryset.order_by(*order_by)
 
+    def query_by_aggregates(self, queryset):
+        """
+        hook to group the filtered queryset before it is ordered, see AggregateListAPIView.
+        """
+        return queryset
+
     def get_filtered_queryset(self, queryset=None):
         if queryset is None:
             queryset = self.get_queryset()
 
         queryset = self.query_by_user(queryset)
+        queryset = self.query_by_permissions(queryset)
         queryset = self.query_by_lookup_map(queryset)
         queryset = self.query_by_extra_map(queryset)
         queryset = self.query_by_filter_schema(queryset)
+        queryset = self.query_by_aggregates(queryset)
         queryset = self.query_by_ordering(queryset)
 
+        if self.explain_pending:
+            # get_filtered_queryset() may run several times per request, the first one is sampled
+            self.explain_pending = False
+            self.sample_explain(queryset)
         return queryset
 
+    def get_explain_sample_rate(self):
+        if self.explain_sample_rate is None:
+            return djackal_settings.EXPLAIN_SAMPLE_RATE
+        return self.explain_sample_rate
+
+    def should_explain(self):
+        return sampled(self.get_explain_sample_rate())
+
+    def get_explain_context(self):
+        """
+        (active filter_schema keys, ordering) identifying the parameter combination.
+        """
+        params = self.get_query_params_dict()
+        filters = sorted(key for key in self.get_filter_schema() if params.get(key) not in (None, '', []))
+        ordering = params.get(self.ordering_key) or self.ordering_default
+        return filters, None if ordering is None else str(ordering)
+
+    def sample_explain(self, queryset):
+        """
+        run EXPLAIN on queryset and record the plan with flags for full scans and temp sorts.
+        """
+        result = explain_queryset(queryset)
+        if result is None:
+            return None
+        filters, ordering = self.get_explain_context()
+        return record_plan(type(self).__name__, filters, ordering, *result)
+
+    def get_facets(self, queryset=None, filter_schema=None):
+        """
+        facet counts of filter_schema entries marked with 'facet', None if there is no facet.
+        """
+        if filter_schema is None:
+            filter_schema = self.get_filter_schema()
+        if not any(query_filter.get_facet_field(value) for value in filter_schema.values()):
+            return None
+
+        if queryset is None:
+            queryset = self.get_queryset()
+
+        queryset = self.query_by_user(queryset)
+        queryset = self.query_by_permissions(queryset)
+        queryset = self.query_by_lookup_map(queryset)
+        queryset = self.query_by_extra_map(queryset)
+
+        return query_filter.faceting(queryset, self.get_query_params_dict(), filter_schema)
+
     def get_object(self, queryset=None):
         if queryset is None:
             queryset = self.get_queryset()
 
         queryset = self.query_by_user(queryset)
+        queryset = self.query_by_permissions(queryset)
         queryset = self.query_by_lookup_map(queryset)
         queryset = self.query_by_extra_map(queryset)
 
         obj = queryset.first()
         if obj is None:
+            if any(getattr(p, 'filter_queryset', None) is not None for p in self.get_permissions()):
+                # missing or hidden by a pushed down permission, 404 for both so existence isn't leaked
+                raise NotFound()
             return None
         self.check_object_permissions(request=self.request, obj=obj)
         return obj
@@ -146,7 +236,7 @@ class DataPurifyMixin:
 
     def get_purified_data(self, key=None, many=False):
         schema = self.get_data_schema(key)
-        return purify(self.request.data, schema, many=many)
+        return get_purifier(schema).purify(self.request.data, many=many)
 
     @cached_property
     def purified_data(self):
@@ -159,7 +249,7 @@ class DataPurifyMixin:
 
     def get_purified_query_params(self, key=None, many=False):
         schema = self.get_query_params_schema(key)
-        return purify(self.get_query_params_dict(), schema, many=many)
+        return get_purifier(schema).purify(self.get_query_params_dict(), many=many)
 
     @cached_property
     def purified_query_params(self):
@@ -180,6 +270,56 @@ class BaseDjackalAPIView(APIView):
 
     required_auth = False
 
+    profile = False
+    profile_sample_rate = None
+
+    # encode simple_response straight to bytes when only JSON renderers are allowed
+    fast_render = False
+
+    # identical concurrent GET requests share one handler call and rendered response
+    coalesce = False
+
+    @classmethod
+    def get_view_config(cls):
+        """
+        static view configuration, resolved once per view class.
+        call reset_view_config() after changing class attributes at runtime.
+        """
+        config = cls.__dict__.get('_view_config')
+        if config is None:
+            config = build_view_config(cls)
+            cls._view_config = config
+        return config
+
+    @classmethod
+    def reset_view_config(cls):
+        if '_view_config' in cls.__dict__:
+            del cls._view_config
+
+    def resolve_view_config(self):
+        """
+        configuration of this instance, resolved once per request by dispatch.
+        attributes set on the instance, by as_view(**initkwargs) or assignment, are honoured.
+        call it again after changing them later.
+        """
+        if any(name in self.__dict__ for name in VIEW_CONFIG_ATTRIBUTES):
+            config = build_view_config(self)
+        else:
+            config = self.get_view_config()
+        # maps are copied once here, so the getters hand them out without copying
+        self.view_config = config._replace(
+            lookup_map=dict(config.lookup_map),
+            extra_map=dict(config.extra_map),
+            ordering_map=dict(config.ordering_map),
+            filter_schema=dict(config.filter_schema),
+        )
+        return self.view_config
+
+    @cached_property
+    def view_config(self):
+        # instances used outside dispatch
+        return self.resolve_view_config()
+
     def get_client_ip(self, request):
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
@@ -192,30 +332,42 @@ class BaseDjackalAPIView(APIView):
         return djackal_settings.EXCEPTION_HANDLER
 
     def get_authentication_classes(self):
-        if self.authentication_classes:
-            return (
-                *self.default_authentication_classes,
-                *self.authentication_classes
-            )
-        return self.default_authentication_classes
+        return self.view_config.authentication_classes
 
     def get_authenticators(self):
         return [auth() for auth in self.get_authentication_classes()]
 
+    def use_fast_render(self):
+        return self.fast_render and self.view_config.json_only
+
+    def perform_content_negotiation(self, request, force=False):
+        if self.use_fast_render():
+            renderer = self.get_renderers()[0]
+            return renderer, renderer.media_type
+        return super().perform_content_negotiation(request, force)
+
     def get_permission_classes(self):
-        if self.permission_classes:
-            return (
-                *self.default_permission_classes,
-                *self.permission_classes
-            )
-        return self.default_permission_classes
+        return self.view_config.permission_classes
 
     def get_permissions(self):
         return [permission() for permission in self.get_permission_classes()]
 
+    def get_object_permissions(self):
+        """
+        permissions that must be checked per object.
+        permissions with filter_queryset are already applied to the queryset.
+        """
+        return [
+            permission for permission in self.get_permissions()
+            if getattr(permission, 'filter_queryset', None) is None
+        ]
+
     def pre_check_object_permissions(self, request, obj):
         pass
 
+    def pre_check_objects_permissions(self, request, objs):
+        pass
+
     def pre_check_permissions(self, request):
         pass
 
@@ -228,6 +380,9 @@ class BaseDjackalAPIView(APIView):
     def post_check_object_permissions(self, request, obj):
         pass
 
+    def post_check_objects_permissions(self, request, objs):
+        pass
+
     def post_check_permissions(self, request):
         pass
 
@@ -241,12 +396,131 @@ class BaseDjackalAPIView(APIView):
 
     def check_object_permissions(self, request, obj):
         self.pre_check_object_permissions(request, obj)
-        super().check_object_permissions(request, obj)
+        for permission in self.get_object_permissions():
+            if not permission.has_object_permission(request, self, obj):
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
         self.post_check_object_permissions(request, obj)
 
+    def check_objects_permissions(self, request, objs):
+        """
+        check object permissions for a whole list of objects at once.
+        permissions without has_objects_permission are checked per object.
+        """
+        self.pre_check_objects_permissions(request, objs)
+        for permission in self.get_object_permissions():
+            if hasattr(permission, 'has_objects_permission'):
+                allowed = permission.has_objects_permission(request, self, objs)
+            else:
+                allowed = all(permission.has_object_permission(request, self, obj) for obj in objs)
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, 'message', None),
+                    code=getattr(permission, 'code', None)
+                )
+        self.post_check_objects_permissions(request, objs)
+
+    def get_profile_sample_rate(self):
+        if self.profile_sample_rate is None:
+            return djackal_settings.PROFILE_SAMPLE_RATE
+        return self.profile_sample_rate
+
+    def should_profile(self, request):
+        """
+        profile when enabled on the view (sampled) or requested with a signed token.
+        """
+        if self.profile and sampled(self.get_profile_sample_rate()):
+            return True
+        if djackal_settings.PROFILE_ALLOW_TOKEN:
+            token = get_profile_token(request)
+            return token is not None and check_profile_token(token, request)
+        return False
+
+    def handle_profile(self, profile, response):
+        directory = djackal_settings.PROFILE_DIR
+        if directory:
+            path = profile.dump(directory)
+            response['X-Djackal-Profile'] = os.path.basename(path)
+
+        if djackal_settings.PROFILE_IN_META and self.result_root and self.result_meta:
+            data = getattr(response, 'data', None)
+            if isinstance(data, dict) and isinstance(data.get(self.result_meta), dict):
+                data[self.result_meta]['profile'] = profile.summary()
+                # the body is already encoded by fast render or coalescing
+                if isinstance(response, FastJSONResponse):
+                    response.encode()
+                elif getattr(response, 'is_rendered', False):
+                    response.content = response.rendered_content
+
+    def should_coalesce(self, request):
+        # a client pinned to the primary must not get a response read from the replica
+        return self.coalesce and request.method == 'GET' and not is_pinned_to_primary(request)
+
+    def get_coalesce_scope(self, request):
+        """
+        requests of different scopes never share a response, the user by default.
+        """
+        user = request.user
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
+
+    def get_coalesce_key(self, request, *args, **kwargs):
+        params = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        return make_coalesce_key(
+            type(self).__module__,
+            type(self).__qualname__,
+            args,
+            sorted(kwargs.items()),
+            params,
+            request.accepted_media_type,
+            self.get_coalesce_scope(request),
+        )
+
+    def coalesce_response(self, request, handler, *args, **kwargs):
+        """
+        the leader runs handler and renders, followers get a copy of the rendered response.
+        a response setting cookies is never shared, followers run handler themselves.
+        """
+        computed = {}
+
+        def compute():
+            response = handler(request, *args, **kwargs)
+            response = self.finalize_response(request, response, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            # finalized here, perform_dispatch doesn't finalize it again
+            response.coalesced = True
+            computed['response'] = response
+            if response.cookies:
+                return None
+            return snapshot_response(response)
+
+        snapshot, _ = coalesce(self.get_coalesce_key(request, *args, **kwargs), compute)
+        if 'response' in computed:
+            return computed['response']
+        if snapshot is None:
+            return handler(request, *args, **kwargs)
+        return restore_response(snapshot)
+
     def dispatch(self, request, *args, **kwargs):
+        if not self.should_profile(request):
+            return self.perform_dispatch(request, *args, **kwargs)
+
+        with RequestProfile(self.__class__.__name__) as profile:
+            response = self.perform_dispatch(request, *args, **kwargs)
+        if profile.enabled:
+            self.handle_profile(profile, response)
+        return response
+
+    def perform_dispatch(self, request, *args, **kwargs):
         self.args = args
         self.kwargs = kwargs
+        self.resolve_view_config()
         request = self.initialize_request(request, *args, **kwargs)
         self.request = request
         self.headers = self.default_response_headers
@@ -261,7 +535,10 @@ class BaseDjackalAPIView(APIView):
                 handler = self.http_method_not_allowed
 
             self.pre_method_call(request, *args, **kwargs)
-            response = handler(request, *args, **kwargs)
+            if self.should_coalesce(request):
+                response = self.coalesce_response(request, handler, *args, **kwargs)
+            else:
+                response = handler(request, *args, **kwargs)
             self.post_method_call(request, response, *args, **kwargs)
 
         except Exception as exc:
@@ -270,6 +547,11 @@ class BaseDjackalAPIView(APIView):
         self.response = self.finalize_response(request, response, *args, **kwargs)
         return self.response
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        if getattr(response, 'coalesced', False):
+            return response
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def handle_exception(self, exc):
         """
         high jacking exception and handle with default_exception_handler
@@ -291,12 +573,21 @@ class BaseDjackalAPIView(APIView):
         return kwargs
 
     def get_query_params_dict(self):
+        """
+        parsed once per request and shared by every caller, do not mutate.
+        """
+        query_params = self.request.query_params
+        cached = self.__dict__.get('_query_params_dict')
+        if cached is not None and cached[0] is query_params:
+            return cached[1]
+
         result = {}
-        for key, value in self.request.query_params.lists():
+        for key, value in query_params.lists():
             if len(value) == 1:
                 result[key] = value[0]
             else:
                 result[key] = value
+        self._query_params_dict = (query_params, result)
         return result
 
     def simple_response(self, result=None, status=200, meta=None, headers=None, **kwargs):
@@ -310,6 +601,8 @@ class BaseDjackalAPIView(APIView):
         else:
             response_data = result or dict()
 
+        if not kwargs and self.use_fast_render():
+            return FastJSONResponse(response_data, status=status, headers=headers)
         return Response(response_data, status=status, headers=headers, **kwargs)
 
 
@@ -321,6 +614,24 @@ class DjackalAPIView(BaseDjackalAPIView, QueryFilterMixin, PageMixin, DataPurify
 
     serializer_class = None
 
+    # ?fields=id,name,owner.name and ?exclude=... trim serializer fields and selected columns
+    sparse_fieldsets = False
+    fields_key = 'fields'
+    exclude_key = 'exclude'
+
+    # database alias for list and detail reads, READ_DATABASE setting if None
+    read_database = None
+
+    # select only the columns the serializer reads on list and detail reads
+    auto_defer = False
+    # columns read by SerializerMethodField, properties or object permissions.
+    # when set, fields that can't be resolved to columns no longer disable the deferral
+    required_columns = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.explain_pending = self.should_explain()
+
     def get_queryset(self):
         assert self.queryset is not None or self.model is not None, (
             '{} should include a `queryset` or `model` attribute'
@@ -333,8 +644,9 @@ class DjackalAPIView(BaseDjackalAPIView, QueryFilterMixin, PageMixin, DataPurify
             return self.model.objects.all()
 
     def get_model(self):
-        if self.model is not None:
-            return self.model
+        model = self.view_config.model
+        if model is not None:
+            return model
         queryset = self.get_queryset()
         assert queryset is not None, (
             '{} should include a `model` or `queryset` attribute'
@@ -348,11 +660,107 @@ class DjackalAPIView(BaseDjackalAPIView, QueryFilterMixin, PageMixin, DataPurify
     def get_serializer_context(self, **kwargs):
         return kwargs
 
+    def get_read_queryset(self, queryset=None):
+        """
+        queryset for list and detail reads, from the read replica if configured,
+        selecting only the columns of the serializer with auto_defer or requested sparse fields.
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+
+        alias = self.get_read_database()
+        if alias is not None:
+            queryset = queryset.using(alias)
+
+        if not self.auto_defer and self.get_sparse_fields() is None:
+            return queryset
+
+        columns = self.get_read_columns(queryset)
+        if columns:
+            queryset = queryset.only(*columns)
+        return queryset
+
+    def get_read_database(self):
+        """
+        replica alias, None after a recent write of the client so it reads its writes from the primary.
+        """
+        return get_read_database(self.request, self.read_database)
+
+    def should_pin_to_primary(self, request, response):
+        if not (self.read_database or djackal_settings.READ_DATABASE):
+            return False
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.should_pin_to_primary(request, response):
+            pin_to_primary(response)
+        return response
+
+    def get_read_columns(self, queryset):
+        """
+        `.only()` paths read by the serializer, None if they can't be resolved.
+        select_related() paths are always included.
+        """
+        select_related = get_select_related_paths(queryset)
+        if select_related is True:
+            return None
+
+        required_columns = self.required_columns
+        ignore_unresolved = required_columns is not None
+        if self.get_sparse_fields() is None:
+            columns = get_serializer_class_columns(
+                self.get_serializer_class(), queryset.model, select_related, ignore_unresolved
+            )
+        else:
+            columns = get_serializer_columns(
+                self.get_serializer(None), queryset.model, select_related, ignore_unresolved=ignore_unresolved
+            )
+        if columns is None:
+            return None
+        return {*columns, *select_related, *(required_columns or ()), *self.get_internal_columns()}
+
+    def get_internal_columns(self):
+        """
+        columns read by djackal besides the serializer fields, the fragment cache version and sync_field.
+        """
+        columns = []
+        version_field = getattr(self.get_serializer_class(), 'fragment_version_field', None)
+        if version_field is not None:
+            columns.append(version_field)
+        sync_field = getattr(self, 'sync_field', None)
+        if sync_field is not None:
+            columns.append(sync_field)
+        return columns
+
+    def get_sparse_fields(self):
+        """
+        (include, exclude) field trees from query params, None if not requested.
+        """
+        if not self.sparse_fieldsets:
+            return None
+
+        params = self.get_query_params_dict()
+        include = params.get(self.fields_key)
+        exclude = params.get(self.exclude_key)
+        if not include and not exclude:
+            return None
+        return parse_sparse_fields(include or ''), parse_sparse_fields(exclude or '')
+
+    def trim_serializer(self, ser, include, exclude):
+        invalid = trim_serializer_fields(ser, include, exclude)
+        if invalid:
+            raise BadRequest(message='invalid fields: {}'.format(', '.join(invalid)), fields=invalid)
+
     def get_serializer(self, instance, context=None, many=False, klass=None):
+        sparse_fields = None
         if klass is None:
             klass = self.get_serializer_class()
+            sparse_fields = self.get_sparse_fields()
         context = self.get_serializer_context(**(context or dict()))
         ser = klass(instance, many=many, context=context)
+        if sparse_fields is not None:
+            self.trim_serializer(ser, *sparse_fields)
         return ser
 
     def get_bind_kwargs_map(self, **additional):
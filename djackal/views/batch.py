@@ -0,0 +1,142 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+from djackal.exceptions import BadRequest
+from djackal.routing import SAFE_METHODS, make_primary_token, pin_to_primary
+from djackal.settings import djackal_settings
+from djackal.views.base import BaseDjackalAPIView
+
+__all__ = [
+    'BatchAPIView',
+]
+
+
+class BatchAPIView(BaseDjackalAPIView):
+    """
+    POST {"requests": [{"method": "GET", "path": "/items/?page=1", "body": null}, ...]}
+
+    each sub-request is resolved with the URLconf and dispatched to its view
+    with the batch request's user and auth, so authentication runs once per batch.
+    responses are returned in order as {"status": ..., "data": ...}.
+    consecutive read-only sub-requests run in a thread pool when concurrent is True.
+    """
+    max_requests = 20
+    concurrent = False
+    max_workers = 4
+
+    # set when a sub-request pinned the client to the primary database
+    pinned_to_primary = False
+
+    def get_sub_requests(self):
+        data = self.request.data
+        items = data.get('requests') if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise BadRequest(message='requests must be a list')
+        if len(items) > self.max_requests:
+            raise BadRequest(message='too many requests, max {}'.format(self.max_requests))
+
+        sub_requests = []
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+                raise BadRequest(message='each request requires a path')
+            sub_requests.append((
+                str(item.get('method') or 'GET').upper(),
+                item['path'],
+                item.get('body'),
+            ))
+        return sub_requests
+
+    def build_sub_request(self, method, path, body):
+        http_request = self.request._request
+        path_info, _, query_string = path.partition('?')
+        content = b'' if body is None else json.dumps(body).encode()
+
+        # wsgi.url_scheme and wsgi.errors are kept for is_secure() and absolute links
+        environ = {
+            key: value for key, value in http_request.META.items()
+            if key not in ('wsgi.input', 'CONTENT_TYPE', 'CONTENT_LENGTH')
+        }
+        environ.update({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path_info,
+            'QUERY_STRING': query_string,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(content)),
+            'wsgi.input': BytesIO(content),
+        })
+        if self.pinned_to_primary:
+            # read your writes made earlier in this batch
+            environ[djackal_settings.PRIMARY_STICKY_HEADER] = make_primary_token()
+        sub_request = WSGIRequest(environ)
+        if hasattr(http_request, 'urlconf'):
+            sub_request.urlconf = http_request.urlconf
+
+        # rest_framework Request uses these instead of running authenticators again
+        sub_request._force_auth_user = self.request.user
+        sub_request._force_auth_token = self.request.auth
+        return sub_request
+
+    def get_sub_response(self, method, path, body):
+        sub_request = self.build_sub_request(method, path, body)
+        try:
+            match = resolve(sub_request.path_info, urlconf=getattr(sub_request, 'urlconf', None))
+        except Resolver404:
+            return {'status': 404, 'data': {'message': 'not found'}}
+
+        view_class = getattr(match.func, 'view_class', None)
+        if view_class is not None and issubclass(view_class, BatchAPIView):
+            return {'status': 400, 'data': {'message': 'nested batch is not allowed'}}
+
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        if djackal_settings.PRIMARY_STICKY_COOKIE in response.cookies:
+            self.pinned_to_primary = True
+        if hasattr(response, 'data'):
+            data = response.data
+        elif response.get('Content-Type', '').startswith('application/json'):
+            data = json.loads(response.content)
+        else:
+            data = response.content.decode(response.charset)
+        return {'status': response.status_code, 'data': data}
+
+    def run_concurrent(self, sub_requests):
+        if len(sub_requests) == 1:
+            return [self.get_sub_response(*sub_requests[0])]
+
+        def run(sub_request):
+            try:
+                return self.get_sub_response(*sub_request)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(sub_requests))) as executor:
+            return list(executor.map(run, sub_requests))
+
+    def run_sub_requests(self, sub_requests):
+        if not self.concurrent:
+            return [self.get_sub_response(*sub_request) for sub_request in sub_requests]
+
+        results = []
+        reads = []
+        for sub_request in sub_requests:
+            if sub_request[0] in SAFE_METHODS:
+                reads.append(sub_request)
+                continue
+            # writes run in order, after every read before them
+            if reads:
+                results.extend(self.run_concurrent(reads))
+                reads = []
+            results.append(self.get_sub_response(*sub_request))
+        if reads:
+            results.extend(self.run_concurrent(reads))
+        return results
+
+    def post(self, request, **kwargs):
+        response = self.simple_response(self.run_sub_requests(self.get_sub_requests()))
+        if self.pinned_to_primary:
+            pin_to_primary(response)
+        return response
@@ -0,0 +1,88 @@
+from collections import namedtuple
+from inspect import isclass
+from types import MappingProxyType
+
+from djackal.renderers import is_json_renderer
+
+ViewConfig = namedtuple('ViewConfig', [
+    'authentication_classes',
+    'permission_classes',
+    'lookup_map',
+    'extra_map',
+    'ordering_map',
+    'filter_schema',
+    'model',
+    'json_only',
+])
+
+# attributes read by build_view_config()
+VIEW_CONFIG_ATTRIBUTES = (
+    'default_authentication_classes',
+    'authentication_classes',
+    'default_permission_classes',
+    'permission_classes',
+    'lookup_map',
+    'extra_map',
+    'ordering_map',
+    'filter_schema',
+    'model',
+    'queryset',
+    'renderer_classes',
+)
+
+
+def _merge_classes(default_classes, classes):
+    if classes:
+        return (*default_classes, *classes)
+    return tuple(default_classes)
+
+
+def _frozen_map(value):
+    return MappingProxyType(dict(value or dict()))
+
+
+def _get_config_model(view):
+    """
+    resolve model without calling get_queryset().
+    queryset.model is only used when get_queryset() is not overridden.
+    """
+    model = getattr(view, 'model', None)
+    if model is not None:
+        return model
+
+    queryset = getattr(view, 'queryset', None)
+    if queryset is None:
+        return None
+
+    from djackal.views.base import DjackalAPIView
+
+    view_class = view if isclass(view) else type(view)
+    if getattr(view_class, 'get_queryset', None) is not DjackalAPIView.get_queryset:
+        return None
+    return queryset.model
+
+
+def _is_json_only(renderer_classes):
+    return bool(renderer_classes) and all(is_json_renderer(r) for r in renderer_classes)
+
+
+def build_view_config(view):
+    """
+    resolve static view attributes once. `view` may be a view class or instance.
+    """
+    return ViewConfig(
+        authentication_classes=_merge_classes(
+            getattr(view, 'default_authentication_classes', ()),
+            getattr(view, 'authentication_classes', ()),
+        ),
+        permission_classes=_merge_classes(
+            getattr(view, 'default_permission_classes', ()),
+            getattr(view, 'permission_classes', ()),
+        ),
+        lookup_map=_frozen_map(getattr(view, 'lookup_map', None)),
+        extra_map=_frozen_map(getattr(view, 'extra_map', None)),
+        ordering_map=_frozen_map(getattr(view, 'ordering_map', None)),
+        filter_schema=_frozen_map(getattr(view, 'filter_schema', None)),
+        model=_get_config_model(view),
+        json_only=_is_json_only(getattr(view, 'renderer_classes', ())),
+    )
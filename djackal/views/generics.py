@@ -16,6 +16,7 @@ __all__ = [
     'UpdateDestroyAPIView',
     'DetailUpdateDestroyAPIView',
     'LabelValueListAPIView',
+    'AggregateListAPIView',
 ]
 
 
@@ -104,6 +105,67 @@ class LabelValueListAPIView(DjackalAPIView):
         return LabelValueSerializer
 
     def get(self, request, **kwargs):
-        queryset = self.get_filtered_queryset()
+        queryset = self.get_filtered_queryset(self.get_read_queryset())
         ser = self.get_serializer(queryset, many=True)
         return self.simple_response(ser.data)
+
+
+class AggregateListAPIView(ListAPIView):
+    """
+    list of a SummaryModel, filtered and ordered with filter_schema and ordering_map like any list.
+    with group_by, summary rows are rolled up again, e.g. daily per user rows into daily rows:
+
+        group_by = ('day',)
+        aggregates = {'total': Sum('total'), 'count': Sum('count')}
+
+    ordering_map values must then be names in group_by or aggregates.
+    """
+    group_by = ()
+    aggregates = {}
+
+    def get_group_by(self):
+        return self.group_by
+
+    def get_aggregates(self):
+        return self.aggregates
+
+    def query_by_aggregates(self, queryset):
+        # roll up after filtering, before ordering by rolled up names
+        group_by = self.get_group_by()
+        if not group_by:
+            return queryset
+        return queryset.order_by().values(*group_by).annotate(**self.get_aggregates())
+
+    def get_serializer_class(self):
+        if self.serializer_class is not None:
+            return self.serializer_class
+
+        group_by = self.get_group_by()
+        names = (*group_by, *self.get_aggregates()) if group_by else ()
+        return get_aggregate_serializer(self.get_model(), names)
+
+
+_aggregate_serializers = {}
+
+
+def get_aggregate_serializer(model, names=()):
+    """
+    read only serializer of rolled up names, or of all model fields without names.
+    created once per (model, names).
+    """
+    key = (model, tuple(names))
+    serializer_class = _aggregate_serializers.get(key)
+    if serializer_class is not None:
+        return serializer_class
+
+    if names:
+        fields = {name: serializers.ReadOnlyField() for name in names}
+        serializer_class = type('AggregateSerializer', (serializers.Serializer,), fields)
+    else:
+        class AggregateSerializer(BaseModelSerializer):
+            class Meta:
+                fields = '__all__'
+
+        AggregateSerializer.Meta.model = model
+        serializer_class = AggregateSerializer
+    return _aggregate_serializers.setdefault(key, serializer_class)
@@ -1,4 +1,5 @@
 from djackal.shortcuts import model_update
+from djackal.sync import filter_since, get_deleted_ids, get_last_deletion_id, load_sync_token, make_sync_token
 
 __all__ = [
     'ListViewMixin',
@@ -10,16 +11,74 @@ __all__ = [
 
 
 class ListViewMixin:
+    # timestamp or version column, updated on every write, enabling ?since=<token> delta sync
+    sync_field = None
+    sync_key = 'since'
+    sync_limit = 1000
+
+    def is_sync_request(self):
+        return self.sync_field is not None and self.sync_key in self.get_query_params_dict()
+
+    def sync_list(self, request, **kwargs):
+        """
+        rows changed after the token in (sync_field, pk) order and ids deleted since the token.
+        an empty token starts a full sync. deleted ids come from DeletionLog,
+        so the model must be registered with djackal.sync.register_deletion_log(),
+        and are limited to the filtered queryset's scope. clients apply deleted ids before the rows.
+        """
+        model = self.get_model()
+        token = self.get_query_params_dict()[self.sync_key]
+        queryset = self.get_filtered_queryset(self.get_read_queryset())
+
+        # read before the rows, so a deletion racing with this request is sent again next time.
+        # tombstones come from the rows' database, a lagging replica lags for both
+        deletion_id = get_last_deletion_id(using=queryset.db)
+        if token:
+            value, pk, since_deletion_id = load_sync_token(token, model, self.sync_field)
+            deleted = get_deleted_ids(model, since_deletion_id, deletion_id, queryset=queryset)
+        else:
+            value, pk, deleted = None, None, []
+
+        queryset = filter_since(queryset, self.sync_field, value, pk).order_by(self.sync_field, 'pk')
+        objs = list(queryset[:self.sync_limit + 1])
+        has_more = len(objs) > self.sync_limit
+        objs = objs[:self.sync_limit]
+        self.check_objects_permissions(request, objs)
+
+        if objs:
+            value, pk = getattr(objs[-1], self.sync_field), objs[-1].pk
+
+        ser = self.get_serializer(objs, many=True)
+        return self.simple_response(ser.data, meta={'sync': {
+            'token': make_sync_token(value, pk, deletion_id),
+            'deleted': deleted,
+            'has_more': has_more,
+        }})
+
     def list(self, request, **kwargs):
-        filtered_queryset = self.get_filtered_queryset()
+        if self.is_sync_request():
+            return self.sync_list(request, **kwargs)
 
-        if self.paging:
+        read_queryset = self.get_read_queryset()
+        filtered_queryset = self.get_filtered_queryset(read_queryset)
+
+        # paging without a pagination_class lists everything
+        if self.paginator is not None:
             paginate_queryset = self.get_paginate_queryset(filtered_queryset)
+            self.check_objects_permissions(request, paginate_queryset)
             ser = self.get_serializer(paginate_queryset, many=True)
             meta = self.get_paginated_meta()
+            facets = self.get_facets(read_queryset)
+            if facets is not None:
+                meta['facets'] = facets
             return self.simple_response(ser.data, meta=meta)
 
-        ser = self.get_serializer(filtered_queryset, many=True)
+        objs = list(filtered_queryset)
+        self.check_objects_permissions(request, objs)
+        ser = self.get_serializer(objs, many=True)
+        facets = self.get_facets(read_queryset)
+        if facets is not None:
+            return self.simple_response(ser.data, meta={'facets': facets})
         return self.simple_response(ser.data)
 
 
@@ -43,7 +102,7 @@ class CreateViewMixin:
 
 class DetailViewMixin:
     def detail(self, request, **kwargs):
-        obj = self.get_object()
+        obj = self.get_object(self.get_read_queryset())
         ser = self.get_serializer(obj)
         return self.simple_response(ser.data)
 
@@ -15,3 +15,23 @@ class TestSerializer(serializers.ModelSerializer):
     class Meta:
         model = TestModel
         fields = '__all__'
+
+
+class TestChildModel(models.Model):
+    parent = models.ForeignKey(TestModel, on_delete=models.CASCADE, related_name='children')
+    name = models.CharField(max_length=16)
+    field_text = models.TextField(null=True)
+
+
+class TestParentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TestModel
+        fields = ('id', 'field_char', 'field_int', 'field_text')
+
+
+class TestChildSerializer(serializers.ModelSerializer):
+    parent = TestParentSerializer()
+
+    class Meta:
+        model = TestChildModel
+        fields = ('id', 'name', 'field_text', 'parent')
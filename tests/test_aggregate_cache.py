@@ -0,0 +1,117 @@
+from django.core.management import call_command
+from django.db import models
+
+from djackal.model_mixins import AggregateCacheManager, AggregateCacheMixin, CounterCache, SumCache
+from djackal.tests import DjackalTestCase
+
+
+class CacheParent(models.Model):
+    child_count = models.IntegerField(default=0)
+    score_total = models.IntegerField(default=0)
+
+
+class CacheChild(AggregateCacheMixin, models.Model):
+    parent = models.ForeignKey(CacheParent, null=True, on_delete=models.CASCADE)
+    score = models.IntegerField(null=True)
+
+    objects = AggregateCacheManager()
+
+    aggregate_caches = [
+        CounterCache('parent', 'child_count'),
+        SumCache('parent', 'score_total', 'score'),
+    ]
+
+
+class AggregateCacheTest(DjackalTestCase):
+    def assertCache(self, parent, child_count, score_total):
+        parent.refresh_from_db()
+        self.assertEqual((parent.child_count, parent.score_total), (child_count, score_total))
+
+    def test_save_delete(self):
+        parent1 = CacheParent.objects.create()
+        parent2 = CacheParent.objects.create()
+
+        child = CacheChild.objects.create(parent=parent1, score=3)
+        CacheChild.objects.create(parent=parent1, score=None)
+        self.assertCache(parent1, 2, 3)
+
+        child.score = 5
+        child.save()
+        self.assertCache(parent1, 2, 5)
+
+        child = CacheChild.objects.get(pk=child.pk)
+        child.parent = parent2
+        child.save()
+        self.assertCache(parent1, 1, 0)
+        self.assertCache(parent2, 1, 5)
+
+        child.delete()
+        self.assertCache(parent2, 0, 0)
+
+    def test_bulk(self):
+        parent1 = CacheParent.objects.create()
+        parent2 = CacheParent.objects.create()
+
+        with self.assertMaxQueries(7):
+            CacheChild.objects.bulk_create(
+                [CacheChild(parent=parent1, score=i) for i in range(5)]
+                + [CacheChild(parent=parent2, score=10), CacheChild(parent=None, score=1)]
+            )
+        self.assertCache(parent1, 5, 10)
+        self.assertCache(parent2, 1, 10)
+
+        CacheChild.objects.filter(score__lt=2).delete()
+        self.assertCache(parent1, 3, 9)
+        self.assertCache(parent2, 1, 10)
+
+    def test_save_after_bulk_create(self):
+        parent = CacheParent.objects.create()
+        child, = CacheChild.objects.bulk_create([CacheChild(parent=parent, score=2)])
+
+        child.score = 3
+        child.save()
+        self.assertCache(parent, 1, 3)
+
+        child.delete()
+        self.assertCache(parent, 0, 0)
+
+    def test_save_deferred(self):
+        parent1 = CacheParent.objects.create()
+        parent2 = CacheParent.objects.create()
+        child = CacheChild.objects.create(parent=parent1, score=4)
+
+        child = CacheChild.objects.only('id').get(pk=child.pk)
+        child.parent = parent2
+        child.save()
+        self.assertCache(parent1, 0, 0)
+        self.assertCache(parent2, 1, 4)
+
+        CacheChild.objects.only('id').get(pk=child.pk).delete()
+        self.assertCache(parent2, 0, 0)
+
+    def test_save_update_fields(self):
+        parent1 = CacheParent.objects.create()
+        parent2 = CacheParent.objects.create()
+        child = CacheChild.objects.create(parent=parent1, score=4)
+
+        child.parent = parent2
+        child.score = 6
+        with self.assertNumQueries(2):
+            # update and score_total only, the counter cache is untouched
+            child.save(update_fields=['score'])
+        self.assertCache(parent1, 1, 6)
+        self.assertCache(parent2, 0, 0)
+
+        child.save()
+        self.assertCache(parent1, 0, 0)
+        self.assertCache(parent2, 1, 6)
+
+    def test_recompute(self):
+        parent1 = CacheParent.objects.create()
+        parent2 = CacheParent.objects.create(child_count=3, score_total=3)
+        CacheChild.objects.create(parent=parent1, score=2)
+        CacheChild.objects.filter(parent=parent1).update(score=4)
+
+        call_command('recompute_aggregate_caches', 'tests.CacheChild', '--batch-size', '1')
+        self.assertCache(parent1, 1, 4)
+        self.assertCache(parent2, 0, 0)
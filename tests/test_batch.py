@@ -0,0 +1,139 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import path
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.test import APIRequestFactory
+
+from djackal.pagination import LimitOffsetPagination
+from djackal.tests import DjackalAPITestCase, DjackalTransactionTestCase
+from djackal.views.base import DjackalAPIView
+from djackal.views.batch import BatchAPIView
+from djackal.views.generics import CreateAPIView, DetailAPIView, ListAPIView
+from tests.models import TestModel, TestSerializer
+
+factory = APIRequestFactory()
+
+
+class CountingAuthentication(BaseAuthentication):
+    calls = 0
+
+    def authenticate(self, request):
+        CountingAuthentication.calls += 1
+        return get_user_model().objects.get(username='batch'), 'token'
+
+
+class BatchListAPI(ListAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = (CountingAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    filter_schema = {'field_int': 'field_int'}
+    ordering_default = 'id'
+
+
+class BatchPagedListAPI(BatchListAPI):
+    paging = True
+    pagination_class = LimitOffsetPagination
+
+
+class BatchDetailAPI(DetailAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = (CountingAuthentication,)
+    lookup_map = {'pk': 'pk'}
+
+
+class BatchCreateAPI(CreateAPIView):
+    model = TestModel
+    authentication_classes = (CountingAuthentication,)
+    data_schema = {'field_int': {'convert': int}}
+
+
+class ThreadIdentAPI(DjackalAPIView):
+    authentication_classes = ()
+
+    def get(self, request, **kwargs):
+        return self.simple_response({'user': request.user.username, 'thread': threading.get_ident()})
+
+
+class TestBatchAPI(BatchAPIView):
+    authentication_classes = (CountingAuthentication,)
+
+
+class ConcurrentBatchAPI(BatchAPIView):
+    authentication_classes = (CountingAuthentication,)
+    concurrent = True
+
+
+urlpatterns = [
+    path('items/', BatchListAPI.as_view()),
+    path('items/paged/', BatchPagedListAPI.as_view()),
+    path('items/create/', BatchCreateAPI.as_view()),
+    path('items/<int:pk>/', BatchDetailAPI.as_view()),
+    path('thread/', ThreadIdentAPI.as_view()),
+    path('batch/', TestBatchAPI.as_view()),
+]
+
+
+@override_settings(ROOT_URLCONF='tests.test_batch')
+class BatchTest(DjackalAPITestCase):
+    def setUp(self):
+        get_user_model().objects.create(username='batch')
+        self.obj = TestModel.objects.create(field_int=1)
+        TestModel.objects.create(field_int=2)
+        CountingAuthentication.calls = 0
+
+    def test_batch(self):
+        request = factory.post('/batch/', {'requests': [
+            {'method': 'GET', 'path': '/items/?field_int=2'},
+            {'method': 'POST', 'path': '/items/create/', 'body': {'field_int': 3}},
+            {'path': '/items/{}/'.format(self.obj.pk)},
+            {'path': '/items/'},
+            {'path': '/unknown/'},
+            {'path': '/batch/'},
+        ]}, format='json')
+        response = TestBatchAPI.as_view()(request)
+        self.assertSuccess(response)
+        self.assertEqual(CountingAuthentication.calls, 1)
+
+        result = response.data['result']
+        self.assertEqual([r['status'] for r in result], [200, 200, 200, 200, 404, 400])
+        self.assertEqual([obj['field_int'] for obj in result[0]['data']['result']], [2])
+        self.assertEqual(result[2]['data']['result']['id'], self.obj.pk)
+        self.assertEqual([obj['field_int'] for obj in result[3]['data']['result']], [1, 2, 3])
+
+    def test_paginated_links(self):
+        request = factory.post('/batch/', {'requests': [
+            {'path': '/items/paged/?limit=1'},
+        ]}, format='json', secure=True)
+        response = TestBatchAPI.as_view()(request)
+        self.assertSuccess(response)
+
+        meta = response.data['result'][0]['data']['meta']
+        self.assertEqual(meta['next'], 'https://testserver/items/paged/?limit=1&offset=1')
+        self.assertIsNone(meta['previous'])
+
+    def test_invalid_batch(self):
+        view = TestBatchAPI.as_view()
+        response = view(factory.post('/batch/', {'requests': 'foo'}, format='json'))
+        self.assertStatusCode(400, response)
+
+        requests = [{'path': '/items/'}] * (TestBatchAPI.max_requests + 1)
+        response = view(factory.post('/batch/', {'requests': requests}, format='json'))
+        self.assertStatusCode(400, response)
+
+
+@override_settings(ROOT_URLCONF='tests.test_batch')
+class ConcurrentBatchTest(DjackalTransactionTestCase):
+    def test_concurrent_batch(self):
+        get_user_model().objects.create(username='batch')
+        request = factory.post('/batch/', [{'path': '/thread/'}] * 4, format='json')
+        response = ConcurrentBatchAPI.as_view()(request)
+        self.assertSuccess(response)
+
+        result = response.data['result']
+        self.assertEqual({r['data']['result']['user'] for r in result}, {'batch'})
+        self.assertNotIn(threading.get_ident(), {r['data']['result']['thread'] for r in result})
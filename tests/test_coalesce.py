@@ -0,0 +1,111 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from djackal.coalesce import SingleFlight
+from djackal.routing import make_primary_token
+from djackal.settings import djackal_settings
+from djackal.tests import DjackalTestCase
+from djackal.views.base import BaseDjackalAPIView, DjackalAPIView
+
+factory = APIRequestFactory()
+
+
+class CoalesceAPI(DjackalAPIView):
+    authentication_classes = ()
+    coalesce = True
+    calls = 0
+    release = threading.Event()
+
+    def get(self, request, **kwargs):
+        CoalesceAPI.calls += 1
+        self.release.wait(5)
+        response = self.simple_response({'value': request.query_params.get('value'), 'call': CoalesceAPI.calls})
+        if 'cookie' in request.query_params:
+            response.set_cookie('seen', str(CoalesceAPI.calls), httponly=True)
+        return response
+
+
+class BaseCoalesceAPI(BaseDjackalAPIView):
+    authentication_classes = ()
+    coalesce = True
+
+    def get(self, request, **kwargs):
+        return Response({'value': 1})
+
+
+class CoalesceTest(DjackalTestCase):
+    def setUp(self):
+        CoalesceAPI.calls = 0
+        CoalesceAPI.release.clear()
+        cache.clear()
+
+    def run_concurrent(self, params_list, **extra):
+        view = CoalesceAPI.as_view()
+        responses = [None] * len(params_list)
+
+        def run(i, params):
+            responses[i] = view(factory.get('/', params, **extra))
+
+        threads = [threading.Thread(target=run, args=(i, params)) for i, params in enumerate(params_list)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        CoalesceAPI.release.set()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def test_single_flight(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('key', lambda: 1), (1, False))
+        with self.assertRaises(ValueError):
+            flight.do('key', lambda: int('foo'))
+        self.assertEqual(flight.calls, {})
+
+    def test_coalesce(self):
+        responses = self.run_concurrent([{'value': 'a', 'x': 1}] * 5 + [{'x': 1, 'value': 'b'}])
+        self.assertEqual(CoalesceAPI.calls, 2)
+        self.assertEqual({response.status_code for response in responses}, {200})
+        self.assertLen(1, {response.content for response in responses[:5]})
+        self.assertIn(b'"value":"b"', responses[5].content)
+        self.assertLen(1, {response.data['result']['call'] for response in responses[:5]})
+
+    def test_cookies_not_shared(self):
+        responses = self.run_concurrent([{'cookie': 1}] * 3)
+        self.assertEqual(CoalesceAPI.calls, 3)
+        self.assertLen(3, {response.cookies['seen'].value for response in responses})
+
+    def test_pinned_not_coalesced(self):
+        self.run_concurrent([{'value': 'a'}] * 3, **{djackal_settings.PRIMARY_STICKY_HEADER: make_primary_token()})
+        self.assertEqual(CoalesceAPI.calls, 3)
+
+    def test_base_view_finalized_once(self):
+        response = BaseCoalesceAPI.as_view()(factory.get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.coalesced)
+
+        view = BaseCoalesceAPI()
+        view.headers = {}
+        request = view.initialize_request(factory.get('/'))
+        response = Response({'value': 1})
+        response.coalesced = True
+        self.assertIs(view.finalize_response(request, response), response)
+        self.assertFalse(hasattr(response, 'accepted_renderer'))
+
+    @override_settings(DJACKAL={'COALESCE_CACHE': 'default', 'COALESCE_RESULT_TTL': 5})
+    def test_coalesce_cache(self):
+        responses = self.run_concurrent([{'value': 'a'}] * 3)
+        self.assertEqual(CoalesceAPI.calls, 1)
+        self.assertLen(1, {response.content for response in responses})
+
+        response = CoalesceAPI.as_view()(factory.get('/', {'value': 'a'}))
+        self.assertEqual(response.content, responses[0].content)
+        self.assertFalse(response.cookies)
+        self.assertEqual(response.data['result']['value'], 'a')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(CoalesceAPI.calls, 1)
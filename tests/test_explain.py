@@ -0,0 +1,64 @@
+import json
+
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from djackal.explain import analyze_plan
+from djackal.storage.models import Storage
+from djackal.tests import DjackalAPITestCase
+from djackal.views.generics import ListAPIView
+from tests.models import TestModel, TestSerializer
+
+factory = APIRequestFactory()
+
+
+class ExplainListAPI(ListAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = ()
+    explain_sample_rate = 1
+    filter_schema = {'id': 'id', 'char': 'field_char'}
+    ordering_map = {'int': 'field_int'}
+
+
+class TwiceFilteredAPI(ExplainListAPI):
+    def get(self, request, **kwargs):
+        count = self.get_filtered_queryset().count()
+        return self.simple_response({'count': count, 'rows': len(self.get_filtered_queryset())})
+
+
+class ExplainTest(DjackalAPITestCase):
+    def test_analyze_plan(self):
+        self.assertEqual(analyze_plan('postgresql', 'Sort\n  ->  Seq Scan on t'), {'scan': True, 'temp_sort': True})
+        self.assertEqual(analyze_plan('postgresql', 'Index Scan using t_pkey on t'), {'scan': False, 'temp_sort': False})
+        self.assertEqual(analyze_plan('oracle', 'FULL'), {'scan': False, 'temp_sort': False})
+
+    def test_sample_explain(self):
+        view = ExplainListAPI.as_view()
+        with self.assertLogs('djackal.explain', 'INFO') as logs:
+            view(factory.get('/', {'char': 'a', 'ordering': 'int'}))
+            view(factory.get('/', {'id': 1}))
+        self.assertEqual([record.levelname for record in logs.records], ['WARNING', 'INFO'])
+        self.assertIn("filters=['char'] ordering=int scan=True temp_sort=True", logs.output[0])
+        self.assertIn("filters=['id'] ordering=None scan=False temp_sort=False", logs.output[1])
+
+    @override_settings(DJACKAL={'EXPLAIN_STORE': 'storage'})
+    def test_explain_storage(self):
+        view = ExplainListAPI.as_view()
+        with self.assertLogs('djackal.explain', 'INFO'):
+            view(factory.get('/', {'char': 'a'}))
+            view(factory.get('/', {'char': 'b'}))
+        records = [json.loads(s.value) for s in Storage.objects.filter(key__startswith='djackal.explain.')]
+        self.assertLen(1, records)
+        self.assertEqual(records[0]['samples'], 2)
+        self.assertEqual(records[0]['filters'], ['char'])
+        self.assertTrue(records[0]['scan'])
+
+    def test_sampled_once_per_request(self):
+        with self.assertLogs('djackal.explain', 'INFO') as logs:
+            TwiceFilteredAPI.as_view()(factory.get('/', {'char': 'a'}))
+        self.assertLen(1, logs.records)
+
+    def test_not_sampled(self):
+        with self.assertNoLogs('djackal.explain'):
+            ExplainListAPI.as_view(explain_sample_rate=0)(factory.get('/'))
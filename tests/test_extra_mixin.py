@@ -1,7 +1,8 @@
 from django.db import models
 
 from djackal.fields import JSONField
-from djackal.model_mixins.extra_mixin import ExtraMixin
+from djackal.model_mixins.extra_mixin import ExtraMixin, ExtraAttribute, ExtraManager
+from djackal.query_filter import filtering
 from djackal.tests import DjackalTransactionTestCase
 
 
@@ -25,6 +26,15 @@ class TestModel3(ExtraMixin, models.Model):
     extra = JSONField(default=dict)
 
 
+class TestModel4(ExtraMixin, models.Model):
+    extra_fields = ('b_field1', 'b_field2')
+    extra_promoted_fields = {'b_field1': 'b_field1_index'}
+    extra = JSONField(default=dict)
+    b_field1_index = models.CharField(max_length=150, null=True, db_index=True)
+
+    objects = ExtraManager()
+
+
 class BindMixinTest(DjackalTransactionTestCase):
     def test_bind_values(self):
         tobj = TestModel1()
@@ -68,3 +78,39 @@ class BindMixinTest(DjackalTransactionTestCase):
         tobj.refresh_from_db()
 
         self.assertEqual(changed_value, tobj.b_field1)
+
+    def test_extra_attribute_descriptor(self):
+        self.assertIsInstance(TestModel1.b_field1, ExtraAttribute)
+        self.assertEqual(TestModel1.extra_field_keys, ('b_field1', 'b_field2'))
+        self.assertEqual(TestModel3.extra_field_keys, ('b_field1', 'b_field2'))
+
+        tobj = TestModel1(extra=None)
+        self.assertIsNone(tobj.b_field1)
+        tobj.b_field1 = 'value'
+        self.assertEqual(tobj.extra, {'b_field1': 'value'})
+        self.assertNotIn('b_field1', tobj.__dict__)
+
+    def test_promoted_fields(self):
+        tobj = TestModel4()
+        tobj.b_field1 = 'promoted'
+        tobj.save()
+        self.assertEqual(TestModel4.objects.get(id=tobj.id).b_field1_index, 'promoted')
+
+        tobj.b_field1 = 'changed'
+        tobj.save(update_fields=['extra'])
+        self.assertEqual(TestModel4.objects.get(id=tobj.id).b_field1_index, 'changed')
+
+        objs = [TestModel4.objects.create(), TestModel4.objects.create()]
+        for i, obj in enumerate(objs):
+            obj.b_field1 = f'bulk{i}'
+        TestModel4.objects.bulk_update(objs, ['extra'])
+        self.assertEqual(TestModel4.objects.filter(b_field1_index__startswith='bulk').count(), 2)
+
+        self.assertEqual(TestModel4.get_promoted_lookup('b_field1__icontains'), 'b_field1_index__icontains')
+        self.assertEqual(TestModel4.get_promoted_lookup('extra__b_field1'), 'b_field1_index')
+        self.assertEqual(TestModel4.get_promoted_lookup('b_field2'), 'b_field2')
+
+        queryset = filtering(TestModel4.objects.all(), {'q': 'bulk1'}, {'q': 'b_field1'})
+        self.assertEqual(list(queryset), [objs[1]])
+        queryset = filtering(TestModel4.objects.all(), {'q': 'CHANG'}, {'q': {'field': ('b_field1__icontains',)}})
+        self.assertEqual(list(queryset), [tobj])
@@ -0,0 +1,106 @@
+import os
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.migrations.loader import MigrationLoader
+from django.urls import include, path
+
+from djackal.index_advisor import advise, build_migrations, is_project_app, resolve_column
+from djackal.storage.models import DeletionLog
+from djackal.tests import DjackalTestCase
+from djackal.views.generics import DetailAPIView, ListAPIView
+from tests.models import TestChildModel, TestModel
+
+
+class AdvisorListAPI(ListAPIView):
+    model = TestChildModel
+    lookup_map = {'parent_id': 'parent'}
+    filter_schema = {
+        'name': 'name__icontains',
+        'text': ['field_text', 'parent__field_char'],
+        'search': {'field': 'name', 'action': 'search'},
+    }
+    ordering_map = {'new': '-id', 'name': 'name,-id'}
+
+
+class AdvisorModelListAPI(ListAPIView):
+    model = TestModel
+    filter_schema = {'int': {'field': 'field_int', 'action': 'range'}}
+    ordering_default = '-field_int'
+
+
+class AdvisorDetailAPI(DetailAPIView):
+    model = TestModel
+    lookup_map = {'pk': 'pk'}
+
+
+class AdvisorDeletionLogAPI(ListAPIView):
+    model = DeletionLog
+    filter_schema = {'model': 'model', 'object_id': 'object_id'}
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+urlpatterns = [
+    path('parents/<int:parent_id>/children/', AdvisorListAPI.as_view()),
+    path('models/', include([
+        path('', AdvisorModelListAPI.as_view()),
+        path('<int:pk>/', AdvisorDetailAPI.as_view()),
+    ])),
+    path('deletions/', AdvisorDeletionLogAPI.as_view()),
+    path('users/', ListAPIView.as_view(model=get_user_model(), filter_schema={'email': 'email'})),
+]
+
+
+class IndexAdvisorTest(DjackalTestCase):
+    def test_resolve_column(self):
+        self.assertEqual(resolve_column(TestChildModel, 'parent__field_char__icontains'), (TestModel, 'field_char'))
+        self.assertEqual(resolve_column(TestChildModel, 'parent__id'), (TestChildModel, 'parent'))
+        self.assertEqual(resolve_column(TestChildModel, 'name__in'), (TestChildModel, 'name'))
+        self.assertIsNone(resolve_column(TestModel, 'children__name'))
+
+    def test_advise(self):
+        suggestions = {
+            (s.model, tuple(s.fields)): s.score for s in advise('tests.test_index_advisor')
+        }
+        self.assertEqual(suggestions, {
+            (TestModel, ('field_int',)): 5,
+            (TestChildModel, ('parent', 'name', 'id')): 5,
+            (TestChildModel, ('parent', 'id')): 3,
+            (TestChildModel, ('parent', 'field_text')): 2,
+            (TestModel, ('field_char',)): 2,
+            (DeletionLog, ('object_id',)): 2,
+            (get_user_model(), ('email',)): 2,
+        })
+        # covered by the foreign key index
+        self.assertNotIn((TestChildModel, ('parent',)), suggestions)
+
+    def test_is_project_app(self):
+        self.assertTrue(is_project_app('tests', BASE_DIR))
+        self.assertFalse(is_project_app('tests', os.path.join(BASE_DIR, 'djackal')))
+        self.assertFalse(is_project_app('auth', BASE_DIR))
+        self.assertFalse(is_project_app('storage', BASE_DIR))
+
+    def test_build_migrations(self):
+        suggestions = advise('tests.test_index_advisor')
+        # djackal's own storage app and auth are never migrated, tests has no migrations
+        self.assertEqual(build_migrations(suggestions, BASE_DIR), {})
+
+        with mock.patch('djackal.index_advisor.is_project_app', return_value=True):
+            migrations = build_migrations(suggestions, BASE_DIR)
+        migration = migrations['storage']
+        self.assertTrue(migration.name.endswith('_djackal_index_advisor'))
+        self.assertEqual(migration.dependencies, MigrationLoader(None).graph.leaf_nodes('storage'))
+        self.assertEqual(migration.operations[0].index.fields, ['object_id'])
+
+        out = StringIO()
+        with redirect_stdout(out):
+            call_command(
+                'index_advisor', urlconf='tests.test_index_advisor', emit_migration=True, dry_run=True,
+                base_dir=BASE_DIR,
+            )
+        self.assertIn('Skipped auth: app is outside the project', out.getvalue())
+        self.assertIn('Skipped storage: app is outside the project', out.getvalue())
@@ -0,0 +1,121 @@
+from rest_framework.test import APIRequestFactory
+
+from djackal.permissions import BasePermission
+from djackal.tests import DjackalAPITestCase
+from djackal.views.generics import ListAPIView, DetailAPIView
+from tests.models import TestModel, TestSerializer
+
+factory = APIRequestFactory()
+
+
+class BatchPermission(BasePermission):
+    calls = []
+
+    def handle_objects(self, request, view, objs):
+        self.calls.append(len(objs))
+        return all(obj.field_bool for obj in objs)
+
+
+class ObjectPermission(BasePermission):
+    def handle_object(self, request, view, obj):
+        return obj.field_int != 0
+
+
+class PushdownPermission(BasePermission):
+    def filter_queryset(self, request, view, queryset):
+        return queryset.filter(field_bool=True)
+
+    def handle_object(self, request, view, obj):
+        return False
+
+
+class BatchPermissionListAPI(ListAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    permission_classes = (BatchPermission,)
+    authentication_classes = ()
+    paging = True
+    ordering_default = 'id'
+
+
+class ObjectPermissionListAPI(ListAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    permission_classes = (ObjectPermission,)
+    authentication_classes = ()
+
+
+class UnpaginatedPermissionListAPI(BatchPermissionListAPI):
+    pagination_class = None
+
+
+class PushdownPermissionListAPI(ListAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    permission_classes = (PushdownPermission,)
+    authentication_classes = ()
+    paging = True
+    ordering_default = 'id'
+
+
+class PushdownPermissionDetailAPI(DetailAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    permission_classes = (PushdownPermission,)
+    authentication_classes = ()
+    lookup_map = {'pk': 'pk'}
+
+
+class PermissionTest(DjackalAPITestCase):
+    def setUp(self):
+        BatchPermission.calls.clear()
+
+    def test_batch_object_permissions(self):
+        for i in range(15):
+            TestModel.objects.create(field_int=i + 1)
+
+        view = BatchPermissionListAPI.as_view()
+        response = view(factory.get('/'))
+        self.assertSuccess(response)
+        self.assertLen(10, response.data['result'])
+        self.assertEqual(BatchPermission.calls, [10])
+
+        TestModel.objects.update(field_bool=False)
+        response = view(factory.get('/', {'page': 2}))
+        self.assertStatusCode(403, response)
+        self.assertEqual(BatchPermission.calls, [10, 5])
+
+    def test_paging_without_pagination_class(self):
+        for i in range(15):
+            TestModel.objects.create(field_int=i + 1)
+
+        response = UnpaginatedPermissionListAPI.as_view()(factory.get('/'))
+        self.assertSuccess(response)
+        self.assertLen(15, response.data['result'])
+        self.assertEqual(BatchPermission.calls, [15])
+
+    def test_object_permission_fallback(self):
+        TestModel.objects.create(field_int=1)
+        view = ObjectPermissionListAPI.as_view()
+        self.assertSuccess(view(factory.get('/')))
+
+        TestModel.objects.create(field_int=0)
+        self.assertStatusCode(403, view(factory.get('/')))
+
+    def test_permission_pushdown(self):
+        allowed = [TestModel.objects.create(field_int=i) for i in range(3)]
+        denied = TestModel.objects.create(field_int=10, field_bool=False)
+
+        response = PushdownPermissionListAPI.as_view()(factory.get('/'))
+        self.assertSuccess(response)
+        self.assertEqual(response.data['meta']['count'], 3)
+        self.assertEqual([row['id'] for row in response.data['result']], [obj.id for obj in allowed])
+
+        view = PushdownPermissionDetailAPI.as_view()
+        response = view(factory.get('/'), pk=allowed[0].pk)
+        self.assertSuccess(response)
+        self.assertEqual(response.data['result']['id'], allowed[0].id)
+
+        response = view(factory.get('/'), pk=denied.pk)
+        self.assertStatusCode(404, response)
+        self.assertNotIn('result', response.data)
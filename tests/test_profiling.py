@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from djackal.profiling import make_profile_token, check_profile_token
+from djackal.tests import DjackalAPITestCase
+from djackal.views.base import DjackalAPIView
+
+factory = APIRequestFactory()
+
+
+class ProfileAPI(DjackalAPIView):
+    authentication_classes = ()
+
+    def get(self, request):
+        return self.simple_response({'sum': sum(range(1000))})
+
+
+class ProfiledAPI(ProfileAPI):
+    profile = True
+
+
+class FastProfiledAPI(ProfiledAPI):
+    renderer_classes = (JSONRenderer,)
+    fast_render = True
+
+
+class ProfilingTest(DjackalAPITestCase):
+    @override_settings(DJACKAL={'PROFILE_IN_META': True})
+    def test_view_profile(self):
+        response = ProfiledAPI.as_view()(factory.get('/'))
+        profile = response.data['meta']['profile']
+        self.assertGreater(profile['total_calls'], 0)
+        self.assertTrue(profile['functions'])
+
+        response = ProfileAPI.as_view()(factory.get('/'))
+        self.assertNotIn('profile', response.data['meta'])
+
+        response = ProfiledAPI.as_view(profile_sample_rate=0)(factory.get('/'))
+        self.assertNotIn('profile', response.data['meta'])
+
+        response = FastProfiledAPI.as_view()(factory.get('/'))
+        self.assertIn('profile', json.loads(response.content)['meta'])
+
+    def test_profile_token(self):
+        cache.clear()
+        token = make_profile_token('/')
+        self.assertTrue(check_profile_token(token, factory.get('/')))
+        # one-time
+        self.assertFalse(check_profile_token(token, factory.get('/')))
+        self.assertFalse(check_profile_token(make_profile_token('/') + 'x', factory.get('/')))
+        self.assertFalse(check_profile_token(make_profile_token('/other/'), factory.get('/')))
+
+        user = get_user_model().objects.create(username='profiler')
+        token = make_profile_token('/', user=user)
+        self.assertFalse(check_profile_token(token, factory.get('/')))
+        request = factory.get('/')
+        request.user = user
+        self.assertTrue(check_profile_token(token, request))
+
+        with tempfile.TemporaryDirectory() as directory:
+            view = ProfileAPI.as_view()
+            with override_settings(DJACKAL={'PROFILE_DIR': directory}):
+                response = view(factory.get('/', HTTP_X_DJACKAL_PROFILE=make_profile_token('/')))
+                self.assertNotIn('X-Djackal-Profile', response)
+
+            with override_settings(DJACKAL={'PROFILE_DIR': directory, 'PROFILE_ALLOW_TOKEN': True}):
+                token = make_profile_token('/')
+                response = view(factory.get('/', {'_profile': token}))
+                self.assertIn(response['X-Djackal-Profile'], os.listdir(directory))
+
+                response = view(factory.get('/', {'_profile': token}))
+                self.assertNotIn('X-Djackal-Profile', response)
+
+                response = view(factory.get('/', {'_profile': 'invalid'}))
+                self.assertNotIn('X-Djackal-Profile', response)
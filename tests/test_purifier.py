@@ -0,0 +1,48 @@
+from puty import purify, PutyActionException, PutyException
+from rest_framework.test import APIRequestFactory
+
+from djackal.purifier import get_purifier
+from djackal.tests import DjackalTestCase
+from djackal.views.base import DjackalAPIView
+
+factory = APIRequestFactory()
+
+SCHEMA = {
+    'name': {'required': True, 'type': 'str'},
+    'count': {'default': 1, 'convert': int},
+    'flag': {'default': False, 'rename': 'is_flag'},
+    'tags': {'type': 'list', 'default': list},
+}
+
+
+class PurifyAPI(DjackalAPIView):
+    query_params_schema = {
+        'page': {'convert': int, 'default': 1},
+    }
+
+
+class PurifierTest(DjackalTestCase):
+    def test_compiled_purifier(self):
+        purifier = get_purifier(SCHEMA)
+        self.assertIs(purifier, get_purifier(SCHEMA))
+
+        data = {'name': 'djackal', 'count': '3', 'unknown': 'value'}
+        self.assertEqual(purifier.purify(data), purify(data, SCHEMA))
+        self.assertEqual(purifier.purify([data, data], many=True), purify([data, data], SCHEMA, many=True))
+
+        with self.assertRaises(PutyActionException):
+            purifier.purify({'count': 3})
+        with self.assertRaises(PutyException):
+            get_purifier(None)
+
+    def test_query_params_dict_cache(self):
+        view = PurifyAPI()
+        view.request = view.initialize_request(factory.get('/', {'page': '2', 'id': ['1', '2']}))
+
+        params = view.get_query_params_dict()
+        self.assertEqual(params, {'page': '2', 'id': ['1', '2']})
+        self.assertIs(params, view.get_query_params_dict())
+        self.assertEqual(view.purified_query_params, {'page': 2})
+
+        view.request = view.initialize_request(factory.get('/', {'page': '3'}))
+        self.assertEqual(view.get_query_params_dict(), {'page': '3'})
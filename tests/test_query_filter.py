@@ -0,0 +1,47 @@
+from django.test import override_settings
+
+from djackal.query_filter import filtering, coerce_values
+from djackal.tests import DjackalTestCase
+from tests.models import TestModel
+
+SCHEMA = {
+    'id': {'field': 'id', 'action': 'in'},
+    'char': {'field': 'field_char__in', 'action': 'in'},
+    'range': {'field': 'field_int', 'action': 'range'},
+}
+
+
+class QueryFilterTest(DjackalTestCase):
+    def setUp(self):
+        self.objs = [TestModel.objects.create(field_int=i, field_char=str(i % 3)) for i in range(30)]
+
+    def test_range(self):
+        queryset = filtering(TestModel.objects.all(), {'range': [3, 5]}, SCHEMA)
+        self.assertLen(3, queryset)
+
+    def test_in_coerce(self):
+        queryset = TestModel.objects.all()
+        self.assertEqual(coerce_values(queryset, 'id', ['1', '2', '2', 'x', None, 3]), [1, 2, 3])
+        self.assertEqual(coerce_values(queryset, 'field_char', ['1', '1', '2']), ['1', '2'])
+
+    def test_in(self):
+        ids = [str(obj.id) for obj in self.objs[:5]]
+        self.assertLen(5, filtering(TestModel.objects.all(), {'id': ids + ids + ['wrong']}, SCHEMA))
+        self.assertLen(1, filtering(TestModel.objects.all(), {'id': ids[0]}, SCHEMA))
+        self.assertLen(10, filtering(TestModel.objects.all(), {'char': '1'}, SCHEMA))
+
+    def test_large_in(self):
+        ids = [obj.id for obj in self.objs[:20]] + list(range(100000, 140000))
+
+        with override_settings(DJACKAL={'LARGE_IN_THRESHOLD': 10}):
+            queryset = filtering(TestModel.objects.all(), {'id': ids}, SCHEMA)
+            sql, params = queryset.query.sql_with_params()
+            self.assertEqual(len(params), 1)
+            self.assertLen(20, queryset)
+            self.assertLen(20, filtering(TestModel.objects.all(), {'char': ['0', '1']}, SCHEMA))
+
+    def test_large_in_statement(self):
+        with override_settings(DJACKAL={'LARGE_IN_THRESHOLD': 10}):
+            short = filtering(TestModel.objects.all(), {'id': list(range(1, 20))}, SCHEMA)
+            long = filtering(TestModel.objects.all(), {'id': list(range(1, 2000))}, SCHEMA)
+            self.assertEqual(short.query.sql_with_params()[0], long.query.sql_with_params()[0])
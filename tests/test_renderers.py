@@ -0,0 +1,82 @@
+import datetime
+import decimal
+import json
+import uuid
+from unittest import skipIf
+
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from djackal import renderers
+from djackal.exceptions import NotFound
+from djackal.renderers import FastJSONResponse, json_dumps
+from djackal.tests import DjackalAPITestCase
+from djackal.views.base import DjackalAPIView
+
+factory = APIRequestFactory()
+
+PAYLOAD = {
+    'int': 1,
+    'text': 'djackal   한글',
+    'list': [1, 2, 3],
+    'decimal': decimal.Decimal('1.50'),
+    'uuid': uuid.UUID('12345678123456781234567812345678'),
+    'date': datetime.date(2020, 1, 2),
+    'datetime': datetime.datetime(2020, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+    'duration': datetime.timedelta(seconds=90),
+    'lazy': gettext_lazy('lazy'),
+}
+
+
+class FastRenderAPI(DjackalAPIView):
+    authentication_classes = ()
+    renderer_classes = (JSONRenderer,)
+    fast_render = True
+
+    def get(self, request):
+        if request.query_params.get('error'):
+            raise NotFound(code='TEST_NOT_FOUND')
+        return self.simple_response(PAYLOAD, meta={'count': 1})
+
+
+class BrowsableFastRenderAPI(FastRenderAPI):
+    renderer_classes = (JSONRenderer, BrowsableAPIRenderer)
+
+
+class RendererTest(DjackalAPITestCase):
+    def test_json_dumps(self):
+        content = json_dumps(PAYLOAD)
+        self.assertIn(b'\\u2028', content)
+        self.assertIn('한글'.encode(), content)
+        self.assertEqual(json.loads(content), {
+            'int': 1,
+            'text': 'djackal   한글',
+            'list': [1, 2, 3],
+            'decimal': '1.50',
+            'uuid': '12345678-1234-5678-1234-567812345678',
+            'date': '2020-01-02',
+            'datetime': '2020-01-02T03:04:05Z',
+            'duration': 'P0DT00H01M30S',
+            'lazy': 'lazy',
+        })
+
+    @skipIf(renderers.orjson is None, 'orjson is not installed')
+    def test_orjson_dumps(self):
+        self.assertEqual(json.loads(renderers.orjson_dumps(PAYLOAD)), json.loads(json_dumps(PAYLOAD)))
+
+    def test_fast_render(self):
+        response = FastRenderAPI.as_view()(factory.get('/', HTTP_ACCEPT='text/html'))
+        self.assertIsInstance(response, FastJSONResponse)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content)['meta'], {'count': 1})
+        self.assertEqual(json.loads(response.content)['result']['date'], '2020-01-02')
+
+        response = BrowsableFastRenderAPI.as_view()(factory.get('/'))
+        self.assertNotIsInstance(response, FastJSONResponse)
+
+    def test_fast_render_exception(self):
+        response = FastRenderAPI.as_view()(factory.get('/', {'error': 1}))
+        response.render()
+        self.assertStatusCode(404, response)
+        self.assertEqual(json.loads(response.content)['code'], 'TEST_NOT_FOUND')
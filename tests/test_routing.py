@@ -0,0 +1,89 @@
+import time
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+
+from djackal.tests import DjackalAPITestCase
+from djackal.views.generics import DetailAPIView, LabelValueListAPIView, ListCreateAPIView
+from tests.models import TestModel, TestSerializer
+
+factory = APIRequestFactory()
+
+
+class RoutingListAPI(ListCreateAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = ()
+    data_schema = {'field_int': {'convert': int}}
+    ordering_default = 'id'
+
+
+class RoutingDetailAPI(DetailAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = ()
+    lookup_map = {'pk': 'pk'}
+
+
+class RoutingLabelValueAPI(LabelValueListAPIView):
+    model = TestModel
+    authentication_classes = ()
+    label_field = 'field_char'
+
+
+@override_settings(DJACKAL={'READ_DATABASE': 'replica', 'PRIMARY_STICKY_SECONDS': 10})
+class ReadReplicaTest(DjackalAPITestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.primary_obj = TestModel.objects.create(field_int=1, field_char='p')
+        self.replica_obj = TestModel.objects.using('replica').create(field_int=2, field_char='r')
+
+    def test_reads_from_replica(self):
+        response = RoutingListAPI.as_view()(factory.get('/'))
+        self.assertEqual([obj['field_int'] for obj in response.data['result']], [2])
+
+        response = RoutingDetailAPI.as_view()(factory.get('/'), pk=self.replica_obj.pk)
+        self.assertEqual(response.data['result']['field_int'], 2)
+
+        response = RoutingLabelValueAPI.as_view()(factory.get('/'))
+        self.assertEqual([obj['label'] for obj in response.data['result']], ['r'])
+
+    def test_read_your_writes(self):
+        view = RoutingListAPI.as_view()
+        response = view(factory.post('/', {'field_int': 3}, format='json'))
+        self.assertSuccess(response)
+        self.assertEqual(response.cookies['djackal_primary']['max-age'], 10)
+        token = response['X-Djackal-Primary']
+        self.assertEqual(response.cookies['djackal_primary'].value, token)
+        self.assertTrue(TestModel.objects.filter(field_int=3).exists())
+        self.assertFalse(TestModel.objects.using('replica').filter(field_int=3).exists())
+
+        request = factory.get('/')
+        request.COOKIES['djackal_primary'] = token
+        response = view(request)
+        self.assertEqual([obj['field_int'] for obj in response.data['result']], [1, 3])
+
+        response = view(factory.get('/', HTTP_X_DJACKAL_PRIMARY=token))
+        self.assertEqual([obj['field_int'] for obj in response.data['result']], [1, 3])
+
+        # forged or expired values read from the replica
+        response = view(factory.get('/', HTTP_X_DJACKAL_PRIMARY='1'))
+        self.assertEqual([obj['field_int'] for obj in response.data['result']], [2])
+
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 11):
+            response = view(factory.get('/', HTTP_X_DJACKAL_PRIMARY=token))
+        self.assertEqual([obj['field_int'] for obj in response.data['result']], [2])
+
+        response = view(factory.get('/'))
+        self.assertNotIn('djackal_primary', response.cookies)
+
+    @override_settings(DJACKAL={})
+    def test_without_replica(self):
+        view = RoutingListAPI.as_view()
+        response = view(factory.post('/', {'field_int': 3}, format='json'))
+        self.assertNotIn('djackal_primary', response.cookies)
+
+        response = view(factory.get('/'))
+        self.assertEqual([obj['field_int'] for obj in response.data['result']], [1, 3])
@@ -0,0 +1,107 @@
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection, models
+from django.db.migrations.state import ProjectState
+from django.test.utils import CaptureQueriesContext
+
+from djackal.query_filter import filtering
+from djackal.search import CreateSearchIndex, SearchIndex, register_search_index, to_match_expression
+from djackal.tests import DjackalTestCase, DjackalTransactionTestCase
+
+
+class SearchModel(models.Model):
+    title = models.CharField(max_length=150)
+    body = models.TextField(default='')
+
+
+class UnindexedSearchModel(models.Model):
+    title = models.CharField(max_length=150)
+
+
+search_index = register_search_index(SearchModel, ('title', 'body'))
+
+SCHEMA = {
+    'q': {'field': ('title', 'body'), 'action': 'search'},
+    't': {'field': 'title', 'action': 'search'},
+}
+
+
+class SearchTest(DjackalTestCase):
+    @classmethod
+    def setUpClass(cls):
+        search_index.create_table('default')
+        super().setUpClass()
+
+    def setUp(self):
+        self.jackal = SearchModel.objects.create(title='djackal jackal', body='rest framework')
+        self.django = SearchModel.objects.create(title='django', body='web framework with a jackal')
+        SearchModel.objects.create(title='flask', body='micro framework')
+
+    def search(self, params, queryset=None):
+        if queryset is None:
+            queryset = SearchModel.objects.all()
+        return filtering(queryset, params, SCHEMA)
+
+    def test_match_expression(self):
+        self.assertEqual(to_match_expression('foo "bar'), '"foo"* "bar"*')
+        self.assertEqual(to_match_expression('foo', ('title',)), '{"title"} : ("foo"*)')
+        self.assertIsNone(to_match_expression('"*'))
+
+    def test_search(self):
+        self.assertEqual(set(self.search({'q': 'jack'})), {self.jackal, self.django})
+        self.assertEqual(list(self.search({'t': 'jack'})), [self.jackal])
+        self.assertEqual(list(self.search({'q': 'jackal'}).order_by('-search_rank')), [self.jackal, self.django])
+        self.assertEqual(self.search({'q': 'framework'}).count(), 3)
+        self.assertEqual(self.search({'q': '"*'}).count(), 0)
+
+        self.django.delete()
+        self.assertEqual(list(self.search({'q': 'jackal'})), [self.jackal])
+
+        self.jackal.title = 'renamed'
+        self.jackal.save()
+        self.assertEqual(self.search({'t': 'jackal'}).count(), 0)
+
+    def test_rebuild(self):
+        SearchModel.objects.filter(pk=self.jackal.pk).update(title='updated')
+        self.assertEqual(self.search({'t': 'updated'}).count(), 0)
+
+        call_command('rebuild_search_index', 'tests.SearchModel')
+        self.assertEqual(list(self.search({'t': 'updated'})), [self.jackal])
+
+    def test_no_ddl_on_read(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search({'q': 'jackal'}).count(), 2)
+            self.jackal.save()
+        self.assertFalse([query for query in queries if 'CREATE' in query['sql']])
+
+    def test_missing_table_fallback(self):
+        index = SearchIndex(SearchModel, ('title',), table_name='tests_searchmodel_missing')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(list(index.search(SearchModel.objects.all(), 'djack')), [self.jackal])
+            index.update(self.jackal.pk)
+        self.assertFalse([query for query in queries if 'CREATE' in query['sql']])
+        self.assertNotIn('default', index.ready_aliases)
+
+    def test_postgresql_match(self):
+        where, rank, params = search_index.get_match_sql('postgresql', 'jackal web', ('title', 'body'))
+        self.assertEqual(where, '("title" @@ websearch_to_tsquery(%s) OR "body" @@ websearch_to_tsquery(%s))')
+        self.assertIn('ts_rank(', rank)
+        self.assertEqual(params, ['jackal web', 'jackal web'])
+
+    def test_unindexed_fallback(self):
+        obj = UnindexedSearchModel.objects.create(title='djackal')
+        queryset = filtering(UnindexedSearchModel.objects.all(), {'t': 'jack'}, SCHEMA)
+        self.assertEqual(list(queryset.order_by('-search_rank')), [obj])
+
+
+class CreateSearchIndexTest(DjackalTransactionTestCase):
+    def test_operation(self):
+        operation = CreateSearchIndex('SearchModel', ('title',), table_name='tests_searchmodel_op')
+        state = ProjectState.from_apps(apps)
+        with connection.schema_editor() as editor:
+            operation.database_forwards('tests', editor, state, state)
+        self.assertIn('tests_searchmodel_op', connection.introspection.table_names())
+
+        with connection.schema_editor() as editor:
+            operation.database_backwards('tests', editor, state, state)
+        self.assertNotIn('tests_searchmodel_op', connection.introspection.table_names())
@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from rest_framework import serializers
+
+from djackal.serializers import (
+    BaseModelSerializer, FragmentCacheListSerializer, parse_sparse_fields, trim_serializer_fields
+)
+from djackal.tests import DjackalTestCase
+from tests.models import TestChildModel, TestModel, TestParentSerializer
+
+
+class FragmentSerializer(BaseModelSerializer):
+    fragment_version_field = 'field_int'
+    fragment_context_keys = ('suffix',)
+
+    label = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TestModel
+        fields = ('id', 'field_char', 'label')
+        list_serializer_class = FragmentCacheListSerializer
+
+    def get_label(self, obj):
+        FragmentSerializer.calls += 1
+        return '{}{}'.format(obj.field_char, self.context.get('suffix', ''))
+
+
+class ChildFragmentSerializer(BaseModelSerializer):
+    fragment_version_field = 'name'
+
+    parent = TestParentSerializer()
+
+    class Meta:
+        model = TestChildModel
+        fields = ('id', 'parent')
+        list_serializer_class = FragmentCacheListSerializer
+
+
+class FragmentCacheTest(DjackalTestCase):
+    def setUp(self):
+        cache.clear()
+        FragmentSerializer.calls = 0
+        for i in range(3):
+            TestModel.objects.create(field_char=str(i), field_int=1)
+        TestModel.objects.create(field_char='x', field_int=None)
+
+    def serialize(self, **context):
+        return FragmentSerializer(TestModel.objects.order_by('id'), many=True, context=context).data
+
+    def test_fragment_cache(self):
+        data = self.serialize()
+        self.assertEqual([row['label'] for row in data], ['0', '1', '2', 'x'])
+        self.assertEqual(FragmentSerializer.calls, 4)
+
+        self.assertEqual(self.serialize(), data)
+        self.assertEqual(FragmentSerializer.calls, 5)
+
+        obj = TestModel.objects.get(field_char='1')
+        TestModel.objects.filter(pk=obj.pk).update(field_char='y')
+        self.assertEqual(self.serialize()[1]['label'], '1')
+
+        TestModel.objects.filter(pk=obj.pk).update(field_int=2)
+        self.assertEqual(self.serialize()[1]['label'], 'y')
+
+        FragmentSerializer.calls = 0
+        self.assertEqual([row['label'] for row in self.serialize(suffix='!')], ['0!', 'y!', '2!', 'x!'])
+        self.assertEqual(FragmentSerializer.calls, 4)
+
+    def test_nested_sparse_fields(self):
+        TestChildModel.objects.create(parent=TestModel.objects.get(field_char='0'), name='a')
+
+        def serialize(fields):
+            ser = ChildFragmentSerializer(TestChildModel.objects.all(), many=True)
+            trim_serializer_fields(ser, parse_sparse_fields(fields))
+            return ser.data[0]['parent']
+
+        self.assertEqual(serialize('id,parent.field_char'), {'field_char': '0'})
+        self.assertEqual(set(serialize('id,parent')), {'id', 'field_char', 'field_int', 'field_text'})
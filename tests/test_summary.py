@@ -0,0 +1,105 @@
+import datetime
+
+from django.core.management import call_command
+from django.db import models
+from django.db.models import Count, Sum
+from rest_framework.test import APIRequestFactory
+
+from djackal.expressions import DefaultSum
+from djackal.storage.models import Storage
+from djackal.summary import SummaryModel, refresh_summary
+from djackal.tests import DjackalAPITestCase
+from djackal.views.generics import AggregateListAPIView
+
+factory = APIRequestFactory()
+
+
+class Sale(models.Model):
+    created = models.DateTimeField()
+    user_id = models.IntegerField()
+    amount = models.IntegerField()
+
+
+class DailySale(SummaryModel):
+    day = models.DateField()
+    user_id = models.IntegerField()
+    total = models.IntegerField()
+    count = models.IntegerField()
+
+    summary_source = 'tests.Sale'
+    summary_dimensions = {'day': models.functions.TruncDate('created'), 'user_id': 'user_id'}
+    summary_aggregates = {'total': DefaultSum('amount'), 'count': Count('pk')}
+    # sales are never updated
+    summary_watermark = 'id'
+
+
+class DailySaleAPI(AggregateListAPIView):
+    model = DailySale
+    authentication_classes = ()
+    filter_schema = {'user_id': 'user_id'}
+    ordering_default = 'day'
+
+
+class DailyTotalAPI(DailySaleAPI):
+    group_by = ('day',)
+    aggregates = {'total': Sum('total'), 'count': Sum('count')}
+    ordering_map = {'total': '-total'}
+
+
+def sale(day, user_id, amount):
+    created = datetime.datetime(2024, 1, day, 12, tzinfo=datetime.timezone.utc)
+    return Sale.objects.create(created=created, user_id=user_id, amount=amount)
+
+
+class SummaryTest(DjackalAPITestCase):
+    def rows(self):
+        return list(DailySale.objects.order_by('day', 'user_id').values_list('day', 'user_id', 'total', 'count'))
+
+    def test_refresh(self):
+        sale(1, 1, 10)
+        sale(1, 1, 5)
+        sale(2, 2, 7)
+        self.assertEqual(refresh_summary(DailySale), 2)
+        self.assertEqual(Storage.get(DailySale.get_watermark_key()).value, str(Sale.objects.last().pk))
+        self.assertEqual(refresh_summary(DailySale), 0)
+
+        sale(1, 1, 1)
+        sale(3, 1, 2)
+        with self.assertMaxQueries(10):
+            self.assertEqual(refresh_summary(DailySale), 2)
+        self.assertEqual(self.rows(), [
+            (datetime.date(2024, 1, 1), 1, 16, 3),
+            (datetime.date(2024, 1, 2), 2, 7, 1),
+            (datetime.date(2024, 1, 3), 1, 2, 1),
+        ])
+
+        Sale.objects.filter(user_id=2).delete()
+        call_command('refresh_summaries', 'tests.DailySale', '--full')
+        self.assertLen(2, self.rows())
+
+    def test_aggregate_list(self):
+        sale(1, 1, 10)
+        sale(1, 2, 5)
+        sale(2, 2, 7)
+        refresh_summary(DailySale)
+
+        response = DailySaleAPI.as_view()(factory.get('/', {'user_id': 2}))
+        self.assertEqual([(row['day'], row['total']) for row in response.data['result']], [
+            ('2024-01-01', 5), ('2024-01-02', 7),
+        ])
+
+        response = DailyTotalAPI.as_view()(factory.get('/', {'ordering': 'total'}))
+        self.assertEqual(response.data['result'], [
+            {'day': datetime.date(2024, 1, 1), 'total': 15, 'count': 2},
+            {'day': datetime.date(2024, 1, 2), 'total': 7, 'count': 1},
+        ])
+        self.assertIs(DailyTotalAPI().get_serializer_class(), DailyTotalAPI().get_serializer_class())
+        self.assertIs(DailySaleAPI().get_serializer_class(), DailySaleAPI().get_serializer_class())
+
+    def test_watermark_required(self):
+        with self.assertRaisesMessage(ValueError, 'summary_watermark is required'):
+            class NoWatermarkSale(SummaryModel):
+                day = models.DateField()
+
+                summary_source = 'tests.Sale'
+                summary_dimensions = {'day': models.functions.TruncDate('created')}
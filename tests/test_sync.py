@@ -0,0 +1,153 @@
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import Q
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+
+from djackal.storage.models import DeletionLog
+from djackal.sync import get_deleted_ids, get_queryset_scope, make_sync_token, register_deletion_log
+from djackal.tests import DjackalAPITestCase
+from djackal.views.generics import ListAPIView
+
+factory = APIRequestFactory()
+
+
+class SyncModel(models.Model):
+    owner = models.IntegerField()
+    name = models.CharField(max_length=16)
+    updated = models.DateTimeField(auto_now=True)
+
+
+register_deletion_log(SyncModel, scope_fields=('owner',))
+
+
+class SyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SyncModel
+        fields = ('id', 'name')
+
+
+class SyncListAPI(ListAPIView):
+    model = SyncModel
+    serializer_class = SyncSerializer
+    authentication_classes = ()
+    filter_schema = {'owner': 'owner'}
+    sync_field = 'updated'
+    sync_limit = 2
+
+
+class SyncTest(DjackalAPITestCase):
+    def sync(self, token='', **params):
+        response = SyncListAPI.as_view()(factory.get('/', {'since': token, 'owner': 1, **params}))
+        self.assertSuccess(response)
+        return response.data['result'], response.data['meta']['sync']
+
+    def test_sync(self):
+        objs = [SyncModel.objects.create(owner=1, name=str(i)) for i in range(3)]
+        SyncModel.objects.create(owner=2, name='other')
+        SyncModel.objects.create(owner=2, name='deleted before').delete()
+
+        result, sync = self.sync()
+        self.assertEqual([row['name'] for row in result], ['0', '1'])
+        self.assertEqual(sync['deleted'], [])
+        self.assertTrue(sync['has_more'])
+
+        result, sync = self.sync(sync['token'])
+        self.assertEqual([row['name'] for row in result], ['2'])
+        self.assertFalse(sync['has_more'])
+
+        result, sync = self.sync(sync['token'])
+        self.assertEqual(result, [])
+        token = sync['token']
+
+        objs[0].name = 'changed'
+        objs[0].save()
+        deleted_pk = objs[1].pk
+        SyncModel.objects.filter(pk=deleted_pk).delete()
+        self.assertEqual(DeletionLog.objects.filter(model='tests.syncmodel').count(), 2)
+
+        result, sync = self.sync(token)
+        self.assertEqual(result, [{'id': objs[0].pk, 'name': 'changed'}])
+        self.assertEqual(sync['deleted'], [str(deleted_pk)])
+
+        result, sync = self.sync(sync['token'])
+        self.assertEqual((result, sync['deleted']), ([], []))
+
+    def test_scope(self):
+        obj = SyncModel.objects.create(owner=1, name='moved')
+        other = SyncModel.objects.create(owner=2, name='other')
+        _, sync1 = self.sync()
+        _, sync2 = self.sync(owner=2)
+
+        other_pk = other.pk
+        other.delete()
+        obj.owner = 2
+        obj.save()
+        obj.name = 'renamed'
+        obj.save()
+
+        result, sync = self.sync(sync1['token'])
+        self.assertEqual((result, sync['deleted']), ([], [str(obj.pk)]))
+
+        result, sync = self.sync(sync2['token'], owner=2)
+        self.assertEqual(result, [{'id': obj.pk, 'name': 'renamed'}])
+        self.assertEqual(sync['deleted'], [str(other_pk)])
+
+    def test_unknown_scope(self):
+        obj = SyncModel.objects.create(owner=2, name='other')
+        obj_pk = obj.pk
+        obj.delete()
+        queryset = SyncModel.objects.all()
+
+        self.assertEqual(get_queryset_scope(queryset.filter(owner=1, name='a')), {'owner': {'1'}})
+        self.assertEqual(get_queryset_scope(queryset.filter(Q(name='a') | Q(name='b'))), {})
+        self.assertEqual(get_deleted_ids(SyncModel, 0, 10, queryset=queryset.filter(owner=1)), [])
+        self.assertEqual(get_deleted_ids(SyncModel, 0, 10, queryset=queryset), [str(obj_pk)])
+
+        # other owners' rows would leak if these filters were ignored
+        for unknown in (
+            queryset.filter(Q(owner=1) | Q(name='other')),
+            queryset.exclude(owner=1),
+            queryset.filter(owner__gte=1),
+        ):
+            self.assertIsNone(get_queryset_scope(unknown))
+            self.assertEqual(get_deleted_ids(SyncModel, 0, 10, queryset=unknown), [])
+
+    def test_pruned_token(self):
+        SyncModel.objects.create(owner=1, name='deleted').delete()
+        _, sync = self.sync()
+        SyncModel.objects.create(owner=1, name='deleted').delete()
+
+        self.assertEqual(DeletionLog.prune(timezone.now() - timedelta(days=1)), 0)
+        self.sync(sync['token'])
+
+        self.assertEqual(DeletionLog.prune(timezone.now() + timedelta(seconds=1)), 2)
+        response = SyncListAPI.as_view()(factory.get('/', {'since': sync['token'], 'owner': 1}))
+        self.assertStatusCode(400, response)
+        self.assertEqual(response.data['code'], 'SYNC_TOKEN_EXPIRED')
+
+    def test_invalid_token(self):
+        response = SyncListAPI.as_view()(factory.get('/', {'since': 'foo'}))
+        self.assertStatusCode(400, response)
+        self.assertEqual(response.data['code'], 'SYNC_TOKEN_INVALID')
+
+        response = SyncListAPI.as_view()(factory.get('/'))
+        self.assertNotIn('sync', response.data['meta'])
+
+
+@override_settings(DJACKAL={'READ_DATABASE': 'replica'})
+class ReplicaSyncTest(DjackalAPITestCase):
+    databases = {'default', 'replica'}
+
+    def test_tombstones_from_replica(self):
+        token = make_sync_token(None, None, 0)
+        DeletionLog.objects.using('replica').create(model='tests.syncmodel', object_id='7', scope={'owner': '1'})
+        # not replicated yet, sent once the replica catches up
+        DeletionLog.objects.create(model='tests.syncmodel', object_id='8', scope={'owner': '1'})
+
+        response = SyncListAPI.as_view()(factory.get('/', {'since': token, 'owner': 1}))
+        self.assertSuccess(response)
+        self.assertEqual(response.data['meta']['sync']['deleted'], ['7'])
@@ -0,0 +1,52 @@
+from rest_framework.test import APIRequestFactory
+
+from djackal.tests import DjackalTestCase, normalize_sql
+from djackal.views.generics import ListAPIView
+from tests.models import TestModel, TestSerializer
+
+factory = APIRequestFactory()
+
+
+class ItemListAPI(ListAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = ()
+
+
+class AssertionTest(DjackalTestCase):
+    def setUp(self):
+        for i in range(3):
+            TestModel.objects.create(field_int=i)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE a = 1 AND b = 'x''y' AND c IN (1, 2, 3)"),
+            'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...)'
+        )
+
+    def test_max_queries(self):
+        with self.assertMaxQueries(1):
+            ItemListAPI.as_view()(factory.get('/'))
+
+        with self.assertRaisesMessage(AssertionError, 'tests_testmodel'):
+            with self.assertMaxQueries(1):
+                list(TestModel.objects.all())
+                TestModel.objects.count()
+
+    def test_no_duplicate_queries(self):
+        with self.assertNoDuplicateQueries():
+            list(TestModel.objects.all())
+            TestModel.objects.count()
+
+        with self.assertRaisesMessage(AssertionError, '3x'):
+            with self.assertNoDuplicateQueries():
+                for obj in TestModel.objects.all():
+                    TestModel.objects.get(pk=obj.pk)
+
+    def test_max_duration(self):
+        calls = []
+        self.assertMaxDuration(1, calls.append, 1, warmup=2, repeat=3)
+        self.assertEqual(len(calls), 5)
+
+        with self.assertRaises(AssertionError):
+            self.assertMaxDuration(0, sum, range(10000))
@@ -0,0 +1,263 @@
+from rest_framework import serializers
+from rest_framework.permissions import AllowAny
+from rest_framework.test import APIRequestFactory
+
+from djackal.permissions import IsGet
+from djackal.serializers import BaseModelSerializer, FragmentCacheListSerializer, _serializer_columns
+from djackal.tests import DjackalAPITestCase
+from djackal.views.generics import DetailAPIView, ListAPIView
+from tests.models import TestChildModel, TestChildSerializer, TestModel, TestParentSerializer, TestSerializer
+
+factory = APIRequestFactory()
+
+
+class ConfigListAPI(ListAPIView):
+    queryset = TestModel.objects.all()
+    serializer_class = TestSerializer
+    authentication_classes = ()
+    default_permission_classes = (AllowAny,)
+    permission_classes = (IsGet,)
+    filter_schema = {'field_int': 'field_int'}
+    ordering_map = {'int': '-field_int'}
+
+
+class OverriddenConfigListAPI(ConfigListAPI):
+    def get_filter_schema(self, **additional):
+        return super().get_filter_schema(field_char='field_char')
+
+
+class MutatedConfigListAPI(ConfigListAPI):
+    def get_filter_schema(self, **additional):
+        d = super().get_filter_schema(**additional)
+        d['field_char'] = 'field_char'
+        return d
+
+
+class FacetListAPI(ListAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = ()
+    filter_schema = {
+        'char': {'field': 'field_char', 'facet': True},
+        'bool': {'field': 'field_bool', 'facet': True, 'format': lambda v: v == 'true'},
+        'int': 'field_int',
+    }
+
+
+class SparseListAPI(ListAPIView):
+    queryset = TestChildModel.objects.select_related('parent')
+    serializer_class = TestChildSerializer
+    authentication_classes = ()
+    sparse_fieldsets = True
+    ordering_default = 'id'
+
+
+class SparseDetailAPI(DetailAPIView):
+    model = TestModel
+    serializer_class = TestSerializer
+    authentication_classes = ()
+    sparse_fieldsets = True
+    lookup_map = {'pk': 'pk'}
+
+
+class AutoDeferListAPI(ListAPIView):
+    model = TestModel
+    serializer_class = TestParentSerializer
+    authentication_classes = ()
+    auto_defer = True
+    ordering_default = 'id'
+
+
+class MethodFieldSerializer(serializers.ModelSerializer):
+    double = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TestModel
+        fields = ('id', 'double')
+
+    def get_double(self, obj):
+        return obj.field_int * 2
+
+
+class MethodFieldListAPI(AutoDeferListAPI):
+    serializer_class = MethodFieldSerializer
+
+
+class VersionedSerializer(BaseModelSerializer):
+    fragment_version_field = 'field_int'
+
+    class Meta:
+        model = TestModel
+        fields = ('id', 'field_char')
+        list_serializer_class = FragmentCacheListSerializer
+
+
+class VersionedListAPI(AutoDeferListAPI):
+    serializer_class = VersionedSerializer
+    sync_field = 'field_a'
+
+
+class ViewConfigTest(DjackalAPITestCase):
+    def test_view_config(self):
+        config = ConfigListAPI.get_view_config()
+        self.assertIs(config, ConfigListAPI.get_view_config())
+        self.assertEqual(config.permission_classes, (AllowAny, IsGet))
+        self.assertEqual(config.authentication_classes, ())
+        self.assertIs(config.model, TestModel)
+
+        view = ConfigListAPI()
+        self.assertEqual(view.view_config, config)
+        self.assertIs(view.get_filter_schema(), view.get_filter_schema())
+        self.assertEqual(view.get_filter_schema(), config.filter_schema)
+        self.assertEqual(view.get_ordering_map(name='field_char'), {'int': '-field_int', 'name': 'field_char'})
+        view.get_filter_schema()['foo'] = 'bar'
+        self.assertNotIn('foo', config.filter_schema)
+        self.assertNotIn('foo', ConfigListAPI().get_filter_schema())
+
+        self.assertIsNot(OverriddenConfigListAPI.get_view_config(), config)
+
+    def test_view_config_overrides(self):
+        TestModel.objects.create(field_int=1, field_char='a')
+        TestModel.objects.create(field_int=2, field_char='b')
+
+        response = OverriddenConfigListAPI.as_view()(factory.get('/', {'field_char': 'b'}))
+        self.assertLen(1, response.data['result'])
+
+        view = ConfigListAPI.as_view(filter_schema={'char': 'field_char'})
+        response = view(factory.get('/', {'char': 'a', 'ordering': 'int'}))
+        self.assertLen(1, response.data['result'])
+        self.assertEqual(ConfigListAPI.get_view_config().filter_schema, {'field_int': 'field_int'})
+
+        response = MutatedConfigListAPI.as_view()(factory.get('/', {'field_char': 'b'}))
+        self.assertLen(1, response.data['result'])
+        self.assertNotIn('field_char', MutatedConfigListAPI.get_view_config().filter_schema)
+
+    def test_view_config_instance_assignment(self):
+        view = ConfigListAPI()
+        view.filter_schema = {'char': 'field_char'}
+        view.permission_classes = ()
+        self.assertEqual(view.get_filter_schema(), {'char': 'field_char'})
+        self.assertEqual(view.get_permission_classes(), (AllowAny,))
+        self.assertIs(view.view_config, view.view_config)
+
+        view.filter_schema = {'int': 'field_int'}
+        view.resolve_view_config()
+        self.assertEqual(view.get_filter_schema(), {'int': 'field_int'})
+        self.assertEqual(ConfigListAPI.get_view_config().filter_schema, {'field_int': 'field_int'})
+
+
+class FacetTest(DjackalAPITestCase):
+    def test_facets(self):
+        for i in range(6):
+            TestModel.objects.create(field_int=i, field_char='a' if i < 4 else 'b', field_bool=i % 2 == 0)
+
+        view = FacetListAPI.as_view()
+        response = view(factory.get('/'))
+        self.assertEqual(response.data['meta']['facets'], {
+            'char': [{'value': 'a', 'count': 4}, {'value': 'b', 'count': 2}],
+            'bool': [{'value': False, 'count': 3}, {'value': True, 'count': 3}],
+        })
+
+        response = view(factory.get('/', {'char': 'b', 'bool': 'true'}))
+        self.assertLen(1, response.data['result'])
+        self.assertEqual(response.data['meta']['facets'], {
+            'char': [{'value': 'a', 'count': 2}, {'value': 'b', 'count': 1}],
+            'bool': [{'value': False, 'count': 1}, {'value': True, 'count': 1}],
+        })
+
+        response = ConfigListAPI.as_view()(factory.get('/'))
+        self.assertNotIn('facets', response.data['meta'])
+
+
+class SparseFieldsetTest(DjackalAPITestCase):
+    def setUp(self):
+        parent = TestModel.objects.create(field_int=1, field_char='a', field_text='long text')
+        TestChildModel.objects.create(parent=parent, name='child', field_text='long text')
+        self.parent = parent
+
+    def test_sparse_list(self):
+        view = SparseListAPI.as_view()
+        response = view(factory.get('/', {'fields': 'name,parent.field_char'}))
+        self.assertEqual(response.data['result'], [{'name': 'child', 'parent': {'field_char': 'a'}}])
+
+        response = view(factory.get('/', {'exclude': 'field_text,parent.field_text'}))
+        self.assertEqual(list(response.data['result'][0]), ['id', 'name', 'parent'])
+        self.assertNotIn('field_text', response.data['result'][0]['parent'])
+
+        response = view(factory.get('/'))
+        self.assertEqual(response.data['result'][0]['field_text'], 'long text')
+
+    def test_sparse_columns(self):
+        view = SparseListAPI()
+        view.request = view.initialize_request(factory.get('/', {'fields': 'name,parent.field_char'}))
+        view.kwargs = {}
+        queryset = view.get_read_queryset()
+        self.assertEqual(queryset.query.deferred_loading, (
+            {'name', 'parent', 'parent__field_char'}, False,
+        ))
+
+        with self.assertMaxQueries(1):
+            obj = queryset.get()
+            self.assertEqual(obj.parent.field_char, 'a')
+        self.assertIn('field_text', obj.get_deferred_fields())
+
+    def test_sparse_detail(self):
+        response = SparseDetailAPI.as_view()(factory.get('/', {'fields': 'field_int'}), pk=self.parent.pk)
+        self.assertEqual(response.data['result'], {'field_int': 1})
+
+    def test_invalid_fields(self):
+        response = SparseListAPI.as_view()(factory.get('/', {'fields': 'name,unknown,parent.foo'}))
+        self.assertStatusCode(400, response)
+        self.assertEqual(response.data['fields'], ['unknown', 'parent.foo'])
+
+        response = ListAPIView.as_view(
+            model=TestModel, serializer_class=TestSerializer, authentication_classes=()
+        )(factory.get('/', {'fields': 'unknown'}))
+        self.assertSuccess(response)
+
+
+class AutoDeferTest(DjackalAPITestCase):
+    def get_read_queryset(self, view_class, **initkwargs):
+        view = view_class(**initkwargs)
+        view.request = view.initialize_request(factory.get('/'))
+        view.kwargs = {}
+        return view.get_read_queryset()
+
+    def test_auto_defer(self):
+        TestModel.objects.create(field_int=1, field_char='a', field_text='text', field_a=1)
+
+        queryset = self.get_read_queryset(AutoDeferListAPI)
+        self.assertEqual(queryset.query.deferred_loading, ({'id', 'field_char', 'field_int', 'field_text'}, False))
+        self.assertIn(TestParentSerializer, _serializer_columns)
+
+        response = AutoDeferListAPI.as_view()(factory.get('/'))
+        self.assertEqual(response.data['result'][0]['field_text'], 'text')
+
+    def test_required_columns(self):
+        TestModel.objects.create(field_int=2)
+
+        queryset = self.get_read_queryset(MethodFieldListAPI)
+        self.assertEqual(queryset.query.deferred_loading, (frozenset(), True))
+
+        queryset = self.get_read_queryset(MethodFieldListAPI, required_columns=('field_int',))
+        self.assertEqual(queryset.query.deferred_loading, ({'id', 'field_int'}, False))
+
+        view = MethodFieldListAPI.as_view(required_columns=('field_int',))
+        with self.assertMaxQueries(1):
+            response = view(factory.get('/'))
+        self.assertEqual(response.data['result'][0]['double'], 4)
+
+    def test_internal_columns(self):
+        for i in range(5):
+            TestModel.objects.create(field_int=i, field_char=str(i), field_a=i)
+
+        queryset = self.get_read_queryset(VersionedListAPI)
+        self.assertEqual(queryset.query.deferred_loading, ({'id', 'field_char', 'field_int', 'field_a'}, False))
+
+        with self.assertMaxQueries(1):
+            response = VersionedListAPI.as_view()(factory.get('/'))
+        self.assertEqual(len(response.data['result']), 5)
+
+        with self.assertMaxQueries(2):
+            response = VersionedListAPI.as_view()(factory.get('/', {'since': ''}))
+        self.assertEqual(len(response.data['result']), 5)